@@ -0,0 +1,301 @@
+"""
+HTTP benchmark suite for the ToolShare API.
+
+Drives a running API with CONCURRENCY closed-loop clients, each picking
+requests from a weighted mix (catalog browsing, search, tool detail, booking,
+admin dashboard, ...). Reports throughput and p50/p95/p99 latency per
+endpoint and saves the run as JSON; pass --baseline to compare against an
+earlier run and exit non-zero on regressions.
+
+Seed the database first, e.g. `python setup_db.py --scale 50`, and start the
+server the way it runs in production (`uvicorn main:app --workers 4`).
+
+Bookings are made as a dedicated account (BOOKER_LOGIN) registered for the
+run and deleted through the admin API when it ends, which removes every
+reservation it made; the seed data is left as it was. An account left
+behind by an interrupted run is deleted at the start of the next one.
+
+Usage:
+    python benchmarks/api_suite.py --concurrency 64 --duration 30 --scale 50 --output results/base.json
+    python benchmarks/api_suite.py --concurrency 64 --duration 30 --scale 50 --baseline results/base.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, timedelta
+from async_concurrency import percentile
+
+# Seed accounts created by setup_db.py
+ADMIN_LOGIN = ("admin@toolshare.com", "admin123")
+USER_LOGINS = [(f"{name}@example.com", "pass123") for name in ("john", "jane", "bob", "alice", "charlie", "david", "eva", "frank", "grace")]
+# Created and deleted by each run; owns no tools and nothing else references it
+BOOKER_LOGIN = ("benchmark-booker@example.com", "benchmark123")
+SEARCH_TERMS = ["drill", "saw", "ladder", "mower", "paint", "lens", "hammer", "bosch", "makita", "garden", "dril", "pressure washer"]
+CATEGORIES = ["Power Tools", "Hand Tools", "Gardening", "Construction", "Painting", "Photography", "Cleaning"]
+
+# name -> weight. Names double as the endpoint labels in the report.
+MIXES = {
+    "default": {
+        "catalog": 25, "catalog_category": 10, "search": 15, "tool_detail": 20, "tool_reviews": 8,
+        "price": 5, "my_reservations": 6, "booking": 5, "admin_stats": 3, "admin_users": 3,
+    },
+    "browse": {"catalog": 35, "catalog_category": 15, "search": 25, "tool_detail": 20, "tool_reviews": 5},
+    "booking": {"tool_detail": 30, "price": 30, "booking": 25, "my_reservations": 15},
+    "admin": {"admin_stats": 50, "admin_users": 25, "admin_tools": 25},
+}
+
+class Client:
+    """Shared state of one run: base url, tokens and known tool ids."""
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.admin_token = None
+        self.user_tokens = []
+        self.booker_token = None
+        self.tool_ids = []
+
+    def request(self, method, path, params=None, body=None, token=None):
+        url = self.base_url + path
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, email, password):
+        status, body = self.request("POST", "/api/auth/login", body={"email": email, "password": password})
+        if status != 200:
+            raise SystemExit(f"Login failed for {email}: {status} {body[:200]!r}")
+        return json.loads(body)["access_token"]
+
+    def prepare(self):
+        self.admin_token = self.login(*ADMIN_LOGIN)
+        self.user_tokens = [self.login(*credentials) for credentials in USER_LOGINS]
+        status, body = self.request("GET", "/api/tools", params={"limit": 500})
+        self.tool_ids = [tool["id"] for tool in json.loads(body)] if status == 200 else []
+        if not self.tool_ids:
+            raise SystemExit("No tools found; seed the database first")
+
+    def add_booker(self):
+        self.remove_booker()
+        email, password = BOOKER_LOGIN
+        status, body = self.request("POST", "/api/auth/register", body={
+            "name": "Benchmark Booker", "email": email, "password": password,
+        })
+        if status != 200:
+            raise SystemExit(f"Registering {email} failed: {status} {body[:200]!r}")
+        self.booker_token = json.loads(body)["access_token"]
+
+    def remove_booker(self):
+        # Cascades to the account's reservations (and their activity rows)
+        status, body = self.request("POST", "/api/auth/login", body=dict(zip(("email", "password"), BOOKER_LOGIN)))
+        if status != 200:
+            return
+        user_id = json.loads(body)["user_id"]
+        status, body = self.request("DELETE", f"/api/admin/users/{user_id}", token=self.admin_token)
+        if status != 200:
+            print(f"Could not delete {BOOKER_LOGIN[0]} (id {user_id}): {status} {body[:200]!r}")
+
+    def dataset(self):
+        status, body = self.request("GET", "/api/admin/stats", token=self.admin_token)
+        return json.loads(body) if status == 200 else {}
+
+def build_operations(client):
+    def catalog(rng):
+        return client.request("GET", "/api/tools", params={"limit": 50})
+
+    def catalog_category(rng):
+        return client.request("GET", "/api/tools", params={"limit": 50, "category": rng.choice(CATEGORIES)})
+
+    def search(rng):
+        return client.request("GET", "/api/tools/search", params={"q": rng.choice(SEARCH_TERMS)})
+
+    def tool_detail(rng):
+        return client.request("GET", f"/api/tools/{rng.choice(client.tool_ids)}")
+
+    def tool_reviews(rng):
+        return client.request("GET", f"/api/tools/{rng.choice(client.tool_ids)}/reviews", params={"limit": 20})
+
+    def price(rng):
+        start = date.today() + timedelta(days=rng.randint(1, 365))
+        return client.request("GET", "/api/reservations/price", params={
+            "tool_id": rng.choice(client.tool_ids), "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.randint(0, 6))).isoformat(),
+        })
+
+    def my_reservations(rng):
+        return client.request("GET", "/api/reservations", params={"limit": 50}, token=rng.choice(client.user_tokens))
+
+    def booking(rng):
+        # Far-future random dates; overlaps answer 400
+        start = date.today() + timedelta(days=rng.randint(30, 3650))
+        return client.request("POST", "/api/reservations", token=client.booker_token, body={
+            "tool_id": rng.choice(client.tool_ids), "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.randint(0, 3))).isoformat(),
+        })
+
+    def admin_stats(rng):
+        return client.request("GET", "/api/admin/stats", token=client.admin_token)
+
+    def admin_users(rng):
+        return client.request("GET", "/api/admin/users", params={"limit": 50}, token=client.admin_token)
+
+    def admin_tools(rng):
+        return client.request("GET", "/api/admin/tools", params={"limit": 50}, token=client.admin_token)
+
+    return {fn.__name__: fn for fn in (
+        catalog, catalog_category, search, tool_detail, tool_reviews, price,
+        my_reservations, booking, admin_stats, admin_users, admin_tools,
+    )}
+
+def run(client, mix, concurrency, duration, warmup, seed):
+    operations = build_operations(client)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            try:
+                status, _ = operations[name](rng)
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - now
+            if now < measure_from:
+                continue
+            with lock:
+                samples[name].append(elapsed)
+                statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+                if status is None or status >= 500:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def summary(latencies, error_count, status_counts=None):
+        result = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / duration, 1),
+            "errors": error_count,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        }
+        if status_counts is not None:
+            result["statuses"] = status_counts
+        return result
+
+    endpoints = {name: summary(samples[name], errors[name], statuses[name]) for name in names}
+    everything = [sample for name in names for sample in samples[name]]
+    return endpoints, summary(everything, sum(errors.values()))
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def compare(result, baseline, tolerance):
+    """Prints per-endpoint deltas against a baseline run; returns the regressions."""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')}):")
+    for name, current in result["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if not previous or not previous["requests"] or not current["requests"]:
+            continue
+        p99_change = (current["p99_ms"] - previous["p99_ms"]) / max(previous["p99_ms"], 0.001)
+        rps_change = (current["throughput_rps"] - previous["throughput_rps"]) / max(previous["throughput_rps"], 0.001)
+        flag = ""
+        if p99_change > tolerance or rps_change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<18} p99 {previous['p99_ms']:>8} -> {current['p99_ms']:>8}ms ({p99_change:+.0%})  "
+              f"rps {previous['throughput_rps']:>7} -> {current['throughput_rps']:>7} ({rps_change:+.0%}){flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds run before measuring")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scale", type=int, default=None, help="setup_db.py --scale the database was seeded with (recorded only)")
+    parser.add_argument("--output", help="Where to save the JSON result (default: benchmarks/results/<mix>-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p99 / throughput change before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    client = Client(args.url)
+    client.prepare()
+    dataset = client.dataset()
+    client.add_booker()
+    print(f"Running mix '{args.mix}' with {args.concurrency} clients for {args.duration}s (+{args.warmup}s warmup)...")
+    try:
+        endpoints, total = run(client, MIXES[args.mix], args.concurrency, args.duration, args.warmup, args.seed)
+    finally:
+        client.remove_booker()
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "url": args.url,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "scale": args.scale,
+            "dataset": {key: dataset.get(key) for key in ("total_users", "total_tools", "total_reservations")},
+        },
+        "total": total,
+        "endpoints": endpoints,
+    }
+
+    print(f"\n{'endpoint':<18} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for name, stats in sorted(endpoints.items(), key=lambda item: -item[1]["requests"]):
+        print(f"{name:<18} {stats['throughput_rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['errors']:>7}")
+    print(f"{'total':<18} {total['throughput_rps']:>8} {total['p50_ms']:>8} {total['p95_ms']:>8} {total['p99_ms']:>8} {total['errors']:>7}")
+
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{args.mix}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            raise SystemExit(f"Regressions: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
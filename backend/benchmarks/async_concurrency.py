@@ -0,0 +1,92 @@
+"""
+Concurrency benchmark for the async request path.
+
+Keeps CONCURRENCY DB-bound requests in flight against a running API while a
+probe thread measures the latency of the DB-free root endpoint. With blocking
+handlers the probe stalls behind the database work (event loop blocked, or
+threadpool exhausted); on the async path it stays flat and DB throughput
+scales with the connection pool instead of the threadpool.
+
+Usage (server must be running, e.g. `uvicorn main:app --workers 1`):
+    python benchmarks/async_concurrency.py --concurrency 50 100 200 --duration 10
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def timed_get(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_level(base_url, path, concurrency, duration):
+    deadline = time.perf_counter() + duration
+    latencies, probes, errors = [], [], []
+
+    def worker():
+        while time.perf_counter() < deadline:
+            try:
+                latencies.append(timed_get(base_url + path))
+            except Exception as e:
+                errors.append(str(e))
+
+    def probe():
+        while time.perf_counter() < deadline:
+            try:
+                probes.append(timed_get(base_url + "/"))
+            except Exception as e:
+                errors.append(str(e))
+            time.sleep(0.05)
+
+    probe_thread = threading.Thread(target=probe)
+    probe_thread.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    probe_thread.join()
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "probe_p50_ms": round(percentile(probes, 50) * 1000, 2),
+        "probe_p99_ms": round(percentile(probes, 99) * 1000, 2),
+        "probe_max_ms": round(max(probes) * 1000, 2) if probes else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/tools", help="DB-bound endpoint to load")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    args = parser.parse_args()
+
+    results = []
+    for level in args.concurrency:
+        result = run_level(args.url, args.path, level, args.duration)
+        results.append(result)
+        print(
+            f"c={level:>4}  {result['throughput_rps']:>8} req/s  "
+            f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms  "
+            f"probe p99={result['probe_p99_ms']}ms max={result['probe_max_ms']}ms  "
+            f"errors={result['errors']}"
+        )
+    print(json.dumps({"path": args.path, "levels": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Login storm benchmark.
+
+Keeps CONCURRENCY login requests in flight against a running API while a
+probe thread measures the latency of a non-auth endpoint. pbkdf2 hashing
+used to run in the request threadpool and hold the GIL, so the probe's p99
+climbed with every concurrent login; with hashing in its own process pool
+the probe stays flat and excess logins are shed with 503 instead of queueing.
+
+Usage (server must be running, e.g. `uvicorn main:app --workers 1`):
+    python benchmarks/login_storm.py --email user@example.com --password secret --concurrency 10 50 200
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from async_concurrency import timed_get, percentile
+
+def timed_login(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+def run_level(base_url, probe_path, body, concurrency, duration):
+    deadline = time.perf_counter() + duration
+    logins, probes, statuses, errors = [], [], {}, []
+
+    def worker():
+        while time.perf_counter() < deadline:
+            try:
+                elapsed, status = timed_login(base_url + "/api/auth/login", body)
+                logins.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+            except Exception as e:
+                errors.append(str(e))
+
+    def probe():
+        while time.perf_counter() < deadline:
+            try:
+                probes.append(timed_get(base_url + probe_path))
+            except Exception as e:
+                errors.append(str(e))
+            time.sleep(0.05)
+
+    probe_thread = threading.Thread(target=probe)
+    probe_thread.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    probe_thread.join()
+
+    return {
+        "concurrency": concurrency,
+        "logins": len(logins),
+        "statuses": statuses,
+        "errors": len(errors),
+        "logins_per_s": round(statuses.get(200, 0) / duration, 1),
+        "login_p99_ms": round(percentile(logins, 99) * 1000, 2),
+        "probe_p50_ms": round(percentile(probes, 50) * 1000, 2),
+        "probe_p99_ms": round(percentile(probes, 99) * 1000, 2),
+        "probe_max_ms": round(max(probes) * 1000, 2) if probes else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--probe-path", default="/api/tools", help="Non-auth endpoint to probe")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    args = parser.parse_args()
+
+    body = json.dumps({"email": args.email, "password": args.password}).encode()
+    results = []
+    for level in args.concurrency:
+        result = run_level(args.url, args.probe_path, body, level, args.duration)
+        results.append(result)
+        print(
+            f"c={level:>4}  {result['logins_per_s']:>7} logins/s  login p99={result['login_p99_ms']}ms  "
+            f"probe p50={result['probe_p50_ms']}ms p99={result['probe_p99_ms']}ms max={result['probe_max_ms']}ms  "
+            f"statuses={result['statuses']} errors={result['errors']}"
+        )
+    print(json.dumps({"probe_path": args.probe_path, "levels": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
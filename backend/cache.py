@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+import psycopg
+from fastapi import Response
+from database import DATABASE_URL, WRITES_CHANNEL, pin_to_primary_local
+from pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+PRICE_CACHE_MAX_ENTRIES = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "100000"))
+
+# Postgres channel used to tell every worker which cache tags went stale
+NOTIFY_CHANNEL = "toolshare_cache"
+
+# Tags: "catalog" for anything listing many tools, "tool:<id>" for one tool,
+# "user:<id>" for a user's role / token version
+CATALOG_TAG = "catalog"
+ALL_TAG = "*"
+
+def tool_tag(tool_id: int) -> str:
+    return f"tool:{tool_id}"
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+class TTLCache:
+    """
+    Bounded LRU cache with a per-entry TTL and tag based invalidation.
+    Only touched from the event loop thread, so it needs no locking.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; see `set`."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str], generation: int):
+        # A load that started before an invalidation may hold stale rows
+        if generation != self._generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, frozenset(tags), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = set(tags)
+        self._generation += 1
+        if ALL_TAG in tags:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            return
+        stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+catalog_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+# (role, token_version) per user, for stateless admin checks in dependencies.py
+auth_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+# tools.daily_price per tool id, for price quotes in pricing.py
+price_cache = TTLCache(PRICE_CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+_caches = (catalog_cache, auth_cache, price_cache)
+
+def invalidate_local(tags: Iterable[str]):
+    tags = list(tags)
+    for cache in _caches:
+        cache.invalidate(tags)
+
+_CACHED_HEADERS = (NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER)
+
+async def cached(key: Hashable, tags: Iterable[str], loader: Callable[[], Awaitable[Any]], response: Optional[Response] = None):
+    """
+    Returns the cached value for `key`, or runs `loader` and caches its result.
+    Pagination headers that the loader set on `response` are cached with it.
+    """
+    entry = catalog_cache.get(key)
+    if entry is not None:
+        value, headers = entry
+        if response is not None:
+            response.headers.update(headers)
+        return value
+
+    generation = catalog_cache.generation
+    value = await loader()
+    headers = {}
+    if response is not None:
+        headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+    catalog_cache.set(key, (value, headers), tags, generation)
+    return value
+
+async def invalidate(conn, *tags: str):
+    """
+    Call inside the writing transaction. Drops the tags locally right away and
+    queues a NOTIFY, which Postgres delivers to every worker (this one
+    included) only if the transaction commits.
+    """
+    invalidate_local(tags)
+    cur = conn.cursor()
+    await cur.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, ",".join(tags)))
+
+async def listen_for_invalidations():
+    """
+    Background task: applies invalidations published by any worker, and
+    the read-your-writes pins of database.pin_to_primary on the same
+    connection. Notifications sent while disconnected are lost, so the
+    whole cache is dropped on every (re)connect.
+    """
+    while True:
+        try:
+            conn = await psycopg.AsyncConnection.connect(DATABASE_URL, autocommit=True)
+            async with conn:
+                await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                await conn.execute(f"LISTEN {WRITES_CHANNEL}")
+                invalidate_local([ALL_TAG])
+                async for notify in conn.notifies():
+                    if notify.channel == WRITES_CHANNEL:
+                        pin_to_primary_local(int(notify.payload))
+                    else:
+                        invalidate_local(notify.payload.split(","))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Cache listener error: {e}")
+            invalidate_local([ALL_TAG])
+            await asyncio.sleep(1)
@@ -1,6 +1,15 @@
+import asyncio
 import os
-import psycopg
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from fastapi import HTTPException
+from psycopg import AsyncPipeline
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from metrics import Collector, InstrumentedCursor, db_pool_acquire, db_reads
 
 # Get DB connection string from env or use default
 # Note: In docker-compose, hostname is 'db', mostly for backend running in docker.
@@ -13,14 +22,228 @@ DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-def get_db_connection():
+# Connection pool settings (seconds for the time based ones)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+
+# Read replicas, as comma separated connection strings. Without any, every
+# query goes to the primary (DATABASE_URL).
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_POOL_MAX_SIZE = int(os.getenv("DB_REPLICA_POOL_MAX_SIZE", str(POOL_MAX_SIZE)))
+# Replicas further behind than this get no reads until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "2"))
+# After writing, a user reads from the primary this long. Any replica still
+# in use is at most REPLICA_MAX_LAG_SECONDS behind as of its last check,
+# so the default covers that plus one check interval.
+READ_YOUR_WRITES_SECONDS = float(os.getenv(
+    "DB_READ_YOUR_WRITES_SECONDS", str(REPLICA_MAX_LAG_SECONDS + REPLICA_CHECK_INTERVAL_SECONDS)))
+
+# Postgres channel telling every worker which user just wrote
+WRITES_CHANNEL = "toolshare_writes"
+
+# Created closed; main.py opens it on startup and closes it on shutdown.
+pool = AsyncConnectionPool(
+    DATABASE_URL,
+    min_size=POOL_MIN_SIZE,
+    max_size=POOL_MAX_SIZE,
+    timeout=POOL_TIMEOUT,
+    max_idle=POOL_MAX_IDLE,
+    max_lifetime=POOL_MAX_LIFETIME,
+    check=AsyncConnectionPool.check_connection,
+    kwargs={"row_factory": dict_row, "cursor_factory": InstrumentedCursor},
+    name="toolshare",
+    open=False,
+)
+
+class Replica:
+    """A read replica's pool and its last health check."""
+    def __init__(self, url: str, index: int):
+        parts = urlsplit(url)
+        # host:port only, so credentials never end up in logs
+        self.name = f"{parts.hostname}:{parts.port or 5432}"
+        self.pool = AsyncConnectionPool(
+            url,
+            min_size=1,
+            max_size=REPLICA_POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            max_idle=POOL_MAX_IDLE,
+            max_lifetime=POOL_MAX_LIFETIME,
+            check=AsyncConnectionPool.check_connection,
+            kwargs={"row_factory": dict_row, "cursor_factory": InstrumentedCursor},
+            name=f"toolshare-replica-{index}",
+            open=False,
+        )
+        self.healthy = False
+        self.streaming = False
+        self.lag: Optional[float] = None
+
+    @property
+    def eligible(self) -> bool:
+        return self.healthy and self.streaming and self.lag is not None and self.lag <= REPLICA_MAX_LAG_SECONDS
+
+    @property
+    def load(self) -> float:
+        """Share of the pool's connections in use or waited for."""
+        stats = self.pool.get_stats()
+        busy = stats.get("pool_size", 0) - stats.get("pool_available", 0) + stats.get("requests_waiting", 0)
+        return busy / self.pool.max_size
+
+replicas = [Replica(url, i) for i, url in enumerate(REPLICA_URLS)]
+
+# user id -> monotonic time until which the user's reads go to the primary
+_pinned_until: Dict[int, float] = {}
+
+# Zero when the replica has replayed everything it received: an idle primary
+# sends nothing, and the last replay timestamp alone would look like growing lag.
+# That only holds while WAL is streaming in: a replica cut off from the primary
+# replays what it has and then looks caught up forever. Without pg_monitor (or
+# pg_read_all_stats) the receiver's status reads as NULL, so a running receiver
+# process is the best available sign.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::float AS lag,
+    NOT pg_is_in_recovery() OR EXISTS (
+        SELECT 1 FROM pg_stat_wal_receiver
+        WHERE status = 'streaming' OR (status IS NULL AND pid IS NOT NULL)
+    ) AS streaming
+"""
+
+async def open_pool():
+    await pool.open(wait=True)
+    # Replicas connect in the background; a replica that is down must not block startup
+    for replica in replicas:
+        await replica.pool.open(wait=False)
+
+async def close_pool():
+    for replica in replicas:
+        await replica.pool.close()
+    await pool.close()
+
+async def check_replica(replica: Replica):
+    try:
+        async with replica.pool.connection(timeout=REPLICA_CHECK_INTERVAL_SECONDS) as conn:
+            cur = conn.cursor()
+            await cur.execute(REPLICA_LAG_SQL)
+            row = await cur.fetchone()
+        if not replica.healthy:
+            print(f"Replica {replica.name} is up, lag {row['lag']:.1f}s")
+        if replica.streaming and not row['streaming']:
+            print(f"Replica {replica.name} is not receiving WAL from the primary")
+        replica.lag = row['lag']
+        replica.streaming = row['streaming']
+        replica.healthy = True
+    except Exception as e:
+        if replica.healthy:
+            print(f"Replica {replica.name} is down: {e}")
+        replica.healthy = False
+        replica.streaming = False
+        replica.lag = None
+
+async def monitor_replicas():
+    """Background task: refreshes the health and lag of every replica."""
+    while True:
+        await asyncio.gather(*(check_replica(replica) for replica in replicas))
+        await asyncio.sleep(REPLICA_CHECK_INTERVAL_SECONDS)
+
+def pin_to_primary_local(user_id: int):
+    _pinned_until[user_id] = time.monotonic() + READ_YOUR_WRITES_SECONDS
+    # Drop expired pins now and then so the map stays small
+    if len(_pinned_until) > 10000:
+        now = time.monotonic()
+        for key in [key for key, until in _pinned_until.items() if until < now]:
+            del _pinned_until[key]
+
+async def pin_to_primary(conn, user_id: int):
+    """
+    Call inside the writing transaction. Sends the user's reads to the
+    primary for READ_YOUR_WRITES_SECONDS, in this worker right away and, via
+    a NOTIFY delivered on commit, in every other worker.
+    """
+    pin_to_primary_local(user_id)
+    cur = conn.cursor()
+    await cur.execute("SELECT pg_notify(%s, %s)", (WRITES_CHANNEL, str(user_id)))
+
+def is_pinned(user_id: Optional[int]) -> bool:
+    return user_id is not None and _pinned_until.get(user_id, 0) > time.monotonic()
+
+def _pick_replica() -> Optional[Replica]:
+    candidates = [replica for replica in replicas if replica.eligible]
+    if not candidates:
+        return None
+    # Least loaded first; random among equals so idle replicas share the work
+    return min(candidates, key=lambda replica: (replica.load, random.random()))
+
+@asynccontextmanager
+async def connection(readonly: bool = False, user_id: Optional[int] = None):
     """
-    Establishes a connection to the PostgreSQL database.
-    Returns a connection object.
+    Borrows a pooled connection outside of the request dependency, e.g. for
+    handlers that can answer from cache without touching the database.
+    The transaction is committed on success and rolled back on error.
+    With readonly=True the connection may come from the least loaded
+    healthy replica, unless `user_id` wrote recently; without an eligible
+    replica it comes from the primary.
     """
+    target = pool
+    if readonly and replicas:
+        replica = None if is_pinned(user_id) else _pick_replica()
+        if replica is not None:
+            target = replica.pool
+        db_reads.inc(1, "replica" if replica else "primary")
+    start = time.perf_counter()
     try:
-        conn = psycopg.connect(DATABASE_URL, row_factory=dict_row)
-        return conn
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        raise e
+        async with target.connection() as conn:
+            db_pool_acquire.observe(time.perf_counter() - start)
+            yield conn
+    except PoolTimeout as e:
+        print(f"Error acquiring database connection: {e}")
+        raise HTTPException(status_code=503, detail="Database is busy, please retry")
+
+def _pool_metrics():
+    stats = pool.get_stats()
+    yield "toolshare_db_pool_size", "gauge", "Connections currently open, idle or in use.", stats.get("pool_size", 0)
+    yield "toolshare_db_pool_available", "gauge", "Idle connections ready to be lent.", stats.get("pool_available", 0)
+    yield "toolshare_db_pool_requests_waiting", "gauge", "Requests currently queued for a connection.", stats.get("requests_waiting", 0)
+    yield "toolshare_db_pool_requests_total", "counter", "Connections requested from the pool.", stats.get("requests_num", 0)
+    yield "toolshare_db_pool_requests_queued_total", "counter", "Requests that had to wait for a connection.", stats.get("requests_queued", 0)
+    yield "toolshare_db_pool_wait_seconds_total", "counter", "Total time requests waited for a connection.", stats.get("requests_wait_ms", 0) / 1000
+    yield "toolshare_db_pool_timeouts_total", "counter", "Requests that timed out waiting (answered 503).", stats.get("requests_errors", 0)
+
+Collector(_pool_metrics)
+
+def _replica_metrics():
+    if not replicas:
+        return
+    yield "toolshare_db_replicas_eligible", "gauge", "Replicas healthy and within the lag limit.", sum(replica.eligible for replica in replicas)
+    known = [replica.lag for replica in replicas if replica.lag is not None]
+    yield "toolshare_db_replica_max_lag_seconds", "gauge", "Largest replay lag among reachable replicas.", max(known, default=0)
+    yield "toolshare_db_pinned_users", "gauge", "Users currently reading from the primary after a write.", sum(until > time.monotonic() for until in _pinned_until.values())
+
+Collector(_replica_metrics)
+
+async def fetch_pipelined(conn, *statements: Tuple[str, Sequence]) -> List[Optional[list]]:
+    """
+    Sends independent (query, params) statements in a single round trip using
+    psycopg pipeline mode and returns the rows of each, in order (None for
+    statements that return no rows). Like any batch, an error in one statement
+    aborts the ones after it. Falls back to one round trip per statement when
+    libpq is too old for pipelining.
+    """
+    cursors = []
+    if AsyncPipeline.is_supported():
+        async with conn.pipeline():
+            for query, params in statements:
+                cur = conn.cursor()
+                await cur.execute(query, params)
+                cursors.append(cur)
+    else:
+        for query, params in statements:
+            cur = conn.cursor()
+            await cur.execute(query, params)
+            cursors.append(cur)
+    return [await cur.fetchall() if cur.description else None for cur in cursors]
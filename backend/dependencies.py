@@ -1,10 +1,10 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
-from database import get_db_connection
+from database import connection, pin_to_primary, replicas
+from cache import auth_cache, user_tag
 import os
 
 # Configuration
@@ -12,16 +12,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password Hashing
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,24 +24,77 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)):
+def request_user_id(request: Request) -> Optional[int]:
+    """User id of a valid bearer token on the request; None if anonymous or invalid."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+# Methods that never write; everything else runs on the primary
+READ_METHODS = ("GET", "HEAD")
+
+async def get_db_connection(request: Request):
+    """
+    FastAPI dependency that lends one pooled AsyncConnection for the whole request.
+    FastAPI caches dependencies per request, so auth dependencies and the
+    handler receive the same connection. The transaction is committed when the
+    request succeeds and rolled back if it raises.
+    Reads may be served by a replica (see database.connection). Any other
+    request runs on the primary and, once it succeeds, keeps the user's
+    reads on the primary for a while so they see their own writes.
+    """
+    user_id = request_user_id(request)
+    if request.method in READ_METHODS:
+        async with connection(readonly=True, user_id=user_id) as conn:
+            yield conn
+        return
+    async with connection() as conn:
+        yield conn
+        if user_id is not None and replicas:
+            await pin_to_primary(conn, user_id)
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        if payload.get("sub") is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        return int(user_id)
+        return payload
     except JWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
-def get_current_admin_user(current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT role FROM users WHERE id = %s", (current_user_id,))
-        user = cur.fetchone()
-        if not user or user['role'] != 'admin':
-             raise HTTPException(status_code=403, detail="Admin privileges required")
-        return current_user_id
-    finally:
-        conn.close()
+async def get_current_user_id(claims: dict = Depends(get_token_claims)):
+    return int(claims["sub"])
+
+async def is_token_current(claims: dict) -> bool:
+    """
+    True if the user still exists with the role and token version the token
+    was issued for. Answered from the in-memory auth cache; the database is
+    only asked on a miss. The users trigger bumps token_version on role
+    changes and NOTIFYs every worker, so demotions and deletions take effect
+    immediately instead of at token expiry.
+    """
+    user_id = int(claims["sub"])
+    key = ("user", user_id)
+    current = auth_cache.get(key)
+    if current is None:
+        generation = auth_cache.generation
+        async with connection() as conn:
+            cur = conn.cursor()
+            await cur.execute("SELECT role, token_version FROM users WHERE id = %s", (user_id,))
+            user = await cur.fetchone()
+        # Deleted users are cached too, as (None, None)
+        current = (user['role'], user['token_version']) if user else (None, None)
+        auth_cache.set(key, current, [user_tag(user_id)], generation)
+    return current == (claims.get("role"), claims.get("ver", 0))
+
+async def get_current_admin_user(claims: dict = Depends(get_token_claims)):
+    # Role comes from the verified token; no connection is needed on a cache hit
+    if claims.get("role") != 'admin':
+         raise HTTPException(status_code=403, detail="Admin privileges required")
+    if not await is_token_current(claims):
+        raise HTTPException(status_code=401, detail="Token has been revoked, please log in again")
+    return int(claims["sub"])
@@ -0,0 +1,74 @@
+import os
+from typing import AsyncIterator
+from psycopg.rows import tuple_row
+from database import connection
+
+# Bytes buffered before a chunk is sent, and rows per server-side cursor fetch
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+
+# Full table dumps for admins. Ordered by primary key so exports are stable;
+# secrets (password hashes, token versions) are left out on purpose.
+EXPORTS = {
+    "users": "SELECT id, name, email, role, security_score, created_at FROM users ORDER BY id",
+    "tools": (
+        "SELECT id, owner_id, name, description, daily_price, category, status, image_url, created_at "
+        "FROM tools ORDER BY id"
+    ),
+    "reservations": (
+        "SELECT id, tool_id, renter_id, start_date, end_date, total_price, status, created_at "
+        "FROM reservations ORDER BY id"
+    ),
+}
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+async def _chunked(parts: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Coalesces small pieces into EXPORT_CHUNK_BYTES chunks. The first piece is
+    sent on its own so the client sees the response start right away.
+    """
+    buffer = bytearray()
+    first = True
+    async for part in parts:
+        buffer += part
+        if first or len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+            first = False
+    if buffer:
+        yield bytes(buffer)
+
+async def _csv_parts(query: str) -> AsyncIterator[bytes]:
+    # COPY streams rows as Postgres formats them; nothing is buffered server side
+    async with connection(readonly=True) as conn:
+        cur = conn.cursor()
+        async with cur.copy(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+            async for data in copy:
+                yield bytes(data)
+
+async def _ndjson_parts(query: str) -> AsyncIterator[bytes]:
+    # Postgres encodes each row as JSON; a named cursor fetches them in batches
+    async with connection(readonly=True) as conn:
+        cur = conn.cursor(name="export", row_factory=tuple_row)
+        cur.itersize = EXPORT_BATCH_ROWS
+        await cur.execute(f"SELECT row_to_json(e)::text FROM ({query}) e")
+        async for (line,) in cur:
+            yield line.encode() + b"\n"
+        await cur.close()
+
+async def stream_export(table: str, format: str) -> AsyncIterator[bytes]:
+    """
+    Response body for an export. Borrows its own pooled connection, from a
+    replica when one is available, because the request's dependencies are
+    torn down before a StreamingResponse body runs.
+    Memory use is bounded by one chunk (CSV) or one fetch batch (NDJSON).
+    """
+    parts = _csv_parts(EXPORTS[table]) if format == "csv" else _ndjson_parts(EXPORTS[table])
+    try:
+        async for chunk in _chunked(parts):
+            yield chunk
+    except Exception as e:
+        # Headers are already sent; all we can do is end the body early
+        print(f"Export error ({table}): {e}")
+        raise
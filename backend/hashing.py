@@ -0,0 +1,74 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from metrics import Collector
+
+# Password Hashing. Stored hashes below PBKDF2_ROUNDS are flagged by
+# needs_update and replaced on the next successful login.
+PBKDF2_ROUNDS = int(os.getenv("PBKDF2_ROUNDS", "29000"))
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PBKDF2_ROUNDS,
+    pbkdf2_sha256__min_rounds=PBKDF2_ROUNDS,
+)
+
+# pbkdf2 costs tens of milliseconds of CPU per call and holds the GIL, so it
+# runs in a small dedicated process pool instead of the request threadpool.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash jobs running or waiting beyond this are refused with 503
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 16)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+
+# Run inside the worker processes; module level so they can be pickled
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+def open_hash_pool():
+    global _executor
+    if _executor is None:
+        # 'spawn' so workers don't inherit the event loop, sockets or threads
+        _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+def close_hash_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _hash_metrics():
+    yield "toolshare_hash_jobs_in_flight", "gauge", "Password hash jobs running or waiting in the process pool.", _in_flight
+    yield "toolshare_hash_queue_limit", "gauge", "Hash jobs in flight beyond which logins are refused with 503.", HASH_QUEUE_LIMIT
+
+Collector(_hash_metrics)
+
+async def _run(fn, *args):
+    global _in_flight
+    if _in_flight >= HASH_QUEUE_LIMIT:
+        raise HTTPException(status_code=503, detail="Too many login attempts in progress, please retry", headers={"Retry-After": "1"})
+    open_hash_pool()
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _in_flight -= 1
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (valid, new_hash). new_hash is only set for a valid password whose
+    stored hash uses outdated settings (pwd_context.needs_update); the caller
+    should save it.
+    """
+    return await _run(_verify_and_update, password, hashed)
@@ -0,0 +1,64 @@
+import csv
+import io
+import itertools
+import json
+import os
+from typing import BinaryIO, Iterator, List, Tuple
+from pydantic import ValidationError
+from models import ToolCreate
+
+# Rows validated per threadpool hop, and error rows listed in the report
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Column order of the staging table / COPY
+IMPORT_COLUMNS = ("line", "name", "description", "daily_price", "category", "image_url")
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return "ndjson" if extension in ("jsonl", "json") else extension
+
+def read_rows(file: BinaryIO, format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yields (line number, raw row) from an upload without loading it whole.
+    Raw rows are dicts, or an error message for lines that do not parse.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty CSV cells mean "not provided"
+            yield reader.line_num, {k: v for k, v in row.items() if k is not None and v != ""}
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, "Invalid JSON"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+
+def validate_batch(rows: Iterator[Tuple[int, object]]) -> Tuple[List[tuple], List[dict]]:
+    """
+    Validates the next IMPORT_BATCH_ROWS rows with ToolCreate. Returns COPY
+    ready tuples for the valid ones and report entries for the rest. CPU bound,
+    so callers run it in the threadpool.
+    """
+    valid, errors = [], []
+    for line, raw in itertools.islice(rows, IMPORT_BATCH_ROWS):
+        if isinstance(raw, str):
+            errors.append({"line": line, "errors": [{"field": None, "message": raw}]})
+            continue
+        try:
+            tool = ToolCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append({
+                "line": line,
+                "errors": [{"field": ".".join(str(part) for part in err["loc"]) or None, "message": err["msg"]} for err in e.errors()],
+            })
+            continue
+        valid.append((line, tool.name, tool.description, tool.daily_price, tool.category, tool.image_url))
+    return valid, errors
@@ -0,0 +1,73 @@
+"""
+Scheduled refresh of the 'owner_leaderboard' materialized view
+(migrations/0004_owner_leaderboard.py).
+
+Every worker runs the schedule; an advisory lock and the refresh time in
+'leaderboard_refresh' (migrations/0008) make sure one refresh per interval
+does the work. The time is kept out of the view so unchanged rows stay
+unchanged and the concurrent refresh only rewrites what moved.
+
+Usage (e.g. from cron, when the API runs without the background refresh):
+    python leaderboard.py
+"""
+import asyncio
+import os
+from database import connection
+
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))
+# Arbitrary key for pg_try_advisory_xact_lock, shared by every worker
+REFRESH_LOCK_KEY = 724012
+# A little under the interval, so timer jitter never skips a whole round
+REFRESH_MIN_AGE_SECONDS = LEADERBOARD_REFRESH_SECONDS * 0.9
+
+LEADERBOARD_STAMP_SQL = """
+    INSERT INTO leaderboard_refresh (id, refreshed_at) VALUES (TRUE, CURRENT_TIMESTAMP)
+    ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+"""
+
+async def refresh_leaderboard(force: bool = False) -> bool:
+    """
+    REFRESH MATERIALIZED VIEW CONCURRENTLY: readers keep the previous rows
+    until it commits. Skipped when another worker is refreshing, or, unless
+    `force`, when the view is younger than REFRESH_MIN_AGE_SECONDS.
+    Returns whether it refreshed.
+    """
+    async with connection() as conn:
+        cur = conn.cursor()
+        await cur.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (REFRESH_LOCK_KEY,))
+        if not (await cur.fetchone())['locked']:
+            return False
+        if not force:
+            await cur.execute(
+                "SELECT CURRENT_TIMESTAMP - refreshed_at < make_interval(secs => %s) AS fresh FROM leaderboard_refresh",
+                (REFRESH_MIN_AGE_SECONDS,),
+            )
+            row = await cur.fetchone()
+            if row and row['fresh']:
+                return False
+        await cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY owner_leaderboard")
+        await cur.execute(LEADERBOARD_STAMP_SQL)
+    return True
+
+async def refresh_periodically():
+    """Background task started by main.py."""
+    while True:
+        await asyncio.sleep(LEADERBOARD_REFRESH_SECONDS)
+        try:
+            await refresh_leaderboard()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Leaderboard refresh error: {e}")
+
+async def _main():
+    from database import open_pool, close_pool
+    await open_pool()
+    try:
+        await refresh_leaderboard(force=True)
+    finally:
+        await close_pool()
+    print("Leaderboard refreshed.")
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,9 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from database import open_pool, close_pool, monitor_replicas, replicas
+from cache import listen_for_invalidations
+from hashing import open_hash_pool, close_hash_pool
+from metrics import MetricsMiddleware, render as render_metrics
+from slow_queries import close_capture_connection
+from leaderboard import refresh_periodically as refresh_leaderboard_periodically
+from responses import JSONResponse
+from pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
 from routers import auth, tools, users, reservations, admin, reports
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connection pool lives for the lifetime of the app
+    await open_pool()
+    open_hash_pool()
+    cache_listener = asyncio.create_task(listen_for_invalidations())
+    replica_monitor = asyncio.create_task(monitor_replicas()) if replicas else None
+    leaderboard_refresher = asyncio.create_task(refresh_leaderboard_periodically())
+    yield
+    cache_listener.cancel()
+    leaderboard_refresher.cancel()
+    if replica_monitor:
+        replica_monitor.cancel()
+    close_hash_pool()
+    await close_capture_connection()
+    await close_pool()
+
 # App Init
-app = FastAPI(title="ToolShare API")
+app = FastAPI(title="ToolShare API", lifespan=lifespan, default_response_class=JSONResponse)
 
 # CORS
 app.add_middleware(
@@ -12,7 +40,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER],
 )
+# Outermost, so it times everything below it
+app.add_middleware(MetricsMiddleware)
 
 # Include Routers
 app.include_router(auth.router)
@@ -25,5 +56,13 @@ app.include_router(admin.router)
 app.include_router(reports.router)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to ToolShare API v2 (Refactored)"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint for this worker's request, query and
+    connection pool metrics.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,216 @@
+import hashlib
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from psycopg import AsyncCursor
+from slow_queries import SLOW_QUERY_MS, maybe_capture
+
+# In-process Prometheus metrics, rendered in the text exposition format by
+# GET /metrics. Every worker process keeps its own numbers, so scrape each
+# worker (or run one worker per container).
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+_lock = threading.Lock()
+_registry: list = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, *labels: str):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, *labels: str):
+        with _lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+class Collector:
+    """Values computed at scrape time, e.g. connection pool statistics."""
+    def __init__(self, collect: Callable[[], Iterable[Tuple[str, str, str, float]]]):
+        self.collect = collect
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        lines = []
+        for name, kind, help, value in self.collect():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return lines
+
+def render() -> str:
+    lines = []
+    for metric in list(_registry):
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+http_request_duration = Histogram(
+    "toolshare_http_request_duration_seconds", "Request latency by route template and status.",
+    ("method", "route", "status"),
+)
+http_request_queries = Histogram(
+    "toolshare_http_request_queries", "Database statements executed per request.",
+    ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+http_request_db_time = Histogram(
+    "toolshare_http_request_db_seconds", "Time spent executing database statements per request.",
+    ("method", "route"),
+)
+db_query_duration = Histogram(
+    "toolshare_db_query_duration_seconds", "Statement execution time by statement fingerprint.",
+    ("fingerprint", "statement"),
+)
+db_query_rows = Counter(
+    "toolshare_db_query_rows_total", "Rows returned or affected by statement fingerprint.",
+    ("fingerprint", "statement"),
+)
+db_pool_acquire = Histogram(
+    "toolshare_db_pool_acquire_seconds", "Time spent waiting for a pooled connection.",
+)
+db_reads = Counter(
+    "toolshare_db_reads_total", "Read-only connections by the server they were routed to.",
+    ("target",),
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+STATEMENT_LABEL_LENGTH = 160
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> Tuple[str, str]:
+    """
+    (short hash, shortened text) identifying a statement independent of its
+    parameters and of inline literals or whitespace.
+    """
+    normalized = _WHITESPACE.sub(" ", _LITERALS.sub("?", query)).strip()
+    digest = hashlib.md5(normalized.encode()).hexdigest()[:12]
+    return digest, normalized[:STATEMENT_LABEL_LENGTH]
+
+class RequestUsage:
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # Set on the scope by the router once the request has been matched
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+# Usage of the request being served; None outside of requests
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+def record_query(query, params, seconds: float, rows: int):
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    elif not isinstance(query, str):
+        query = type(query).__name__
+    labels = fingerprint(query)
+    db_query_duration.observe(seconds, *labels)
+    if rows > 0:
+        db_query_rows.inc(rows, *labels)
+    usage = _request_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.db_seconds += seconds
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        maybe_capture(query, params, seconds, labels[0], _WHITESPACE.sub(" ", query).strip(), usage.route if usage else None)
+
+class InstrumentedCursor(AsyncCursor):
+    """
+    Cursor used by the connection pool; times every execute(). In pipeline
+    mode execute() only queues the statement, so pipelined statements are
+    counted but their time is paid at the sync point.
+    """
+    async def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            record_query(query, params, time.perf_counter() - start, self.rowcount)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request, including streamed bodies.
+    Routes are labelled by their template (/api/tools/{tool_id}) so the label
+    set stays bounded; requests that match no route share one label.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        usage = RequestUsage(scope)
+        token = _request_usage.set(usage)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_usage.reset(token)
+            route = usage.route
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - start, method, route, str(status))
+            http_request_queries.observe(usage.queries, method, route)
+            http_request_db_time.observe(usage.db_seconds, method, route)
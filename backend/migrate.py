@@ -0,0 +1,235 @@
+"""
+Versioned schema migrations.
+
+Migrations live in migrations/NNNN_description.py and define
+`upgrade(m: Migrator)`. Applied versions are recorded in 'schema_migrations'.
+They start from the schema setup_db.py creates; databases set up before
+the migration runner existed lack parts of it and must be rebuilt instead.
+Steps run in autocommit mode so indexes can be built CONCURRENTLY; every
+helper is idempotent, so a migration interrupted halfway is simply re-run.
+
+Usage:
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list applied / pending versions
+"""
+import argparse
+import importlib.util
+import os
+import re
+import time
+import psycopg
+from psycopg import sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_HOST = os.getenv("POSTGRES_HOST", "localhost")
+DB_USER = os.getenv("POSTGRES_USER", "user")
+DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "password")
+DB_NAME = os.getenv("POSTGRES_DB", "toolshare")
+DB_PORT = os.getenv("POSTGRES_PORT", "5432")
+
+DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+# Arbitrary key for pg_advisory_lock, so only one runner migrates at a time
+ADVISORY_LOCK_KEY = 724011
+
+# DDL waits at most this long for its table lock, then backs off and retries,
+# so a long-running transaction never queues every other query behind it
+LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "2000"))
+LOCK_RETRIES = int(os.getenv("MIGRATION_LOCK_RETRIES", "10"))
+
+class Migrator:
+    """Helpers available to migrations. `conn` is in autocommit mode."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, statement, params=None):
+        """
+        Runs one short-lock statement (e.g. ALTER TABLE) in its own
+        transaction with a lock_timeout, retrying with backoff on lock waits.
+        """
+        for attempt in range(1, LOCK_RETRIES + 1):
+            try:
+                with self.conn.transaction():
+                    self.conn.execute(f"SET LOCAL lock_timeout = {LOCK_TIMEOUT_MS}")
+                    self.conn.execute(statement, params)
+                return
+            except psycopg.errors.LockNotAvailable:
+                if attempt == LOCK_RETRIES:
+                    raise
+                print(f"  lock busy, retrying ({attempt}/{LOCK_RETRIES})...")
+                time.sleep(min(30, 0.5 * 2 ** attempt))
+
+    def add_column(self, table, column, definition):
+        """
+        Adds a column if missing. Keep `definition` to a type plus an optional
+        constant default: that is a catalog-only change on Postgres 11+,
+        so the table is locked only for an instant and never rewritten.
+        Fill computed values with `backfill` instead.
+        """
+        self.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} ").format(
+            sql.Identifier(table), sql.Identifier(column)) + sql.SQL(definition))
+
+    def create_index(self, name, table, columns, unique=False, using="btree", where=None):
+        """
+        Builds an index with CREATE INDEX CONCURRENTLY, which does not block
+        writes. A build that failed earlier leaves an INVALID index behind;
+        it is dropped and rebuilt.
+        """
+        invalid = self.conn.execute(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s AND NOT i.indisvalid",
+            (name,),
+        ).fetchone()
+        if invalid:
+            print(f"  dropping invalid index {name}")
+            self.conn.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+
+        statement = sql.SQL("CREATE {}INDEX CONCURRENTLY IF NOT EXISTS {} ON {} USING {} ({})").format(
+            sql.SQL("UNIQUE " if unique else ""),
+            sql.Identifier(name),
+            sql.Identifier(table),
+            sql.SQL(using),
+            sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        )
+        if where:
+            statement += sql.SQL(" WHERE ") + sql.SQL(where)
+        self.conn.execute(statement)
+
+    def drop_index(self, name):
+        """Drops an index with DROP INDEX CONCURRENTLY, which does not block writes."""
+        self.conn.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+
+    def backfill_insert(self, source, statement, batch_size=5000, pause=0.05):
+        """
+        Runs `statement`, an INSERT ... SELECT reading `source`, once per
+        range of `batch_size` source ids, each committed on its own with a
+        `pause` in between. `statement` must select only the ids from
+        %(start)s (included) to %(end)s (excluded), and skip rows already
+        copied (e.g. ON CONFLICT DO NOTHING) so an interrupted run can be resumed.
+        """
+        low, high = self.conn.execute(
+            sql.SQL("SELECT MIN(id), MAX(id) FROM {}").format(sql.Identifier(source))
+        ).fetchone()
+        if low is None:
+            return 0
+        total = 0
+        for start in range(low, high + 1, batch_size):
+            with self.conn.transaction():
+                total += self.conn.execute(statement, {"start": start, "end": start + batch_size}).rowcount
+            print(f"  {source}: ids up to {min(start + batch_size - 1, high)} of {high} copied")
+            time.sleep(pause)
+        return total
+
+    def backfill(self, table, assignments, where, batch_size=5000, pause=0.05):
+        """
+        UPDATE table SET <assignments> WHERE <where>, in batches of
+        `batch_size` rows, each committed on its own with a `pause` in
+        between, so locks stay short and replicas and vacuum keep up.
+        `where` must stop matching a row once it is updated.
+        """
+        statement = sql.SQL("""
+            UPDATE {table} SET {assignments}
+            WHERE id IN (SELECT id FROM {table} WHERE {where} LIMIT %s FOR UPDATE SKIP LOCKED)
+        """).format(table=sql.Identifier(table), assignments=sql.SQL(assignments), where=sql.SQL(where))
+        total = 0
+        while True:
+            with self.conn.transaction():
+                updated = self.conn.execute(statement, (batch_size,)).rowcount
+            total += updated
+            if updated == 0:
+                break
+            print(f"  {table}: {total} rows backfilled")
+            time.sleep(pause)
+        return total
+
+def discover():
+    """(version, name, path) of every migration file, in version order."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+def _load(version, path):
+    spec = importlib.util.spec_from_file_location(f"migration_{version}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _ensure_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(4) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INTEGER NOT NULL
+        )
+    """)
+
+# What migration 0001 expects on top of the baseline tables, all created by
+# setup_db.py before the migration runner existed
+BASE_SCHEMA_SQL = """
+    SELECT to_regclass('tool_rating_stats') IS NOT NULL
+       AND to_regclass('owner_rating_stats') IS NOT NULL
+       AND to_regclass('stats_counters') IS NOT NULL
+       AND EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'tools' AND column_name = 'search_vector')
+       AND EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'reservations' AND column_name = 'period')
+       AND EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'users' AND column_name = 'token_version')
+"""
+
+def check_base_schema(conn):
+    if not conn.execute(BASE_SCHEMA_SQL).fetchone()[0]:
+        raise SystemExit(
+            "This database was created by an older setup_db.py and cannot be migrated. "
+            "Rebuild it with `python setup_db.py` (this drops all data)."
+        )
+
+def applied_versions(conn):
+    _ensure_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations").fetchall()}
+
+def migrate(conninfo=DATABASE_URL):
+    """Applies pending migrations in order. Returns the versions applied."""
+    applied = []
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        try:
+            done = applied_versions(conn)
+            if not done:
+                check_base_schema(conn)
+            for version, name, path in discover():
+                if version in done:
+                    continue
+                print(f"Applying {version}_{name}...")
+                started = time.perf_counter()
+                _load(version, path).upgrade(Migrator(conn))
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (%s, %s, %s)",
+                    (version, name, duration_ms),
+                )
+                print(f"Applied {version}_{name} in {duration_ms}ms")
+                applied.append(version)
+        finally:
+            conn.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+    return applied
+
+def status(conninfo=DATABASE_URL):
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        done = applied_versions(conn)
+    for version, name, _ in discover():
+        print(f"{version}_{name}: {'applied' if version in done else 'pending'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="List migrations instead of applying them")
+    args = parser.parse_args()
+    if args.status:
+        status()
+    else:
+        applied = migrate()
+        print(f"{len(applied)} migration(s) applied." if applied else "Database is up to date.")
@@ -0,0 +1,12 @@
+"""
+Indexes on the foreign keys behind every join in the routers. Postgres does
+not index referencing columns by itself, so joins from tools to owners,
+reservations to tools / renters and reviews to reservations, and the
+ON DELETE CASCADE checks, scanned whole tables.
+"""
+
+def upgrade(m):
+    m.create_index("idx_tools_owner_id", "tools", ["owner_id"])
+    m.create_index("idx_reservations_tool_id", "reservations", ["tool_id"])
+    m.create_index("idx_reservations_renter_id", "reservations", ["renter_id"])
+    m.create_index("idx_reviews_reservation_id", "reviews", ["reservation_id"])
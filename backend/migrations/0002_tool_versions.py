@@ -0,0 +1,63 @@
+"""
+Per-tool version counter behind the ETags of GET /api/tools/{id} and
+/api/tools/{id}/reviews. Any update of the tool row bumps it, and so does
+any review written, changed or removed for one of its reservations, so a
+conditional GET is answered with one primary key lookup.
+"""
+
+def upgrade(m):
+    m.add_column("tools", "version", "BIGINT NOT NULL DEFAULT 1")
+
+    m.execute("""
+        CREATE OR REPLACE FUNCTION func_bump_tool_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    m.execute("""
+        CREATE OR REPLACE FUNCTION func_bump_reviewed_tool_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'reservations' THEN
+                -- Cascading to its reviews: bump while the reservation still exists
+                UPDATE tools SET version = version + 1
+                WHERE id = OLD.tool_id AND EXISTS (SELECT 1 FROM reviews WHERE reservation_id = OLD.id);
+                RETURN OLD;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE tools t SET version = t.version + 1
+                FROM reservations r WHERE r.id = OLD.reservation_id AND t.id = r.tool_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE tools t SET version = t.version + 1
+                FROM reservations r WHERE r.id = NEW.reservation_id AND t.id = r.tool_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    m.execute("DROP TRIGGER IF EXISTS trg_tool_version ON tools")
+    m.execute("""
+        CREATE TRIGGER trg_tool_version
+        BEFORE UPDATE ON tools
+        FOR EACH ROW
+        EXECUTE FUNCTION func_bump_tool_version()
+    """)
+    m.execute("DROP TRIGGER IF EXISTS trg_review_tool_version ON reviews")
+    m.execute("""
+        CREATE TRIGGER trg_review_tool_version
+        AFTER INSERT OR UPDATE OR DELETE ON reviews
+        FOR EACH ROW
+        EXECUTE FUNCTION func_bump_reviewed_tool_version()
+    """)
+    m.execute("DROP TRIGGER IF EXISTS trg_reservation_reviews_tool_version ON reservations")
+    m.execute("""
+        CREATE TRIGGER trg_reservation_reviews_tool_version
+        BEFORE DELETE ON reservations
+        FOR EACH ROW
+        EXECUTE FUNCTION func_bump_reviewed_tool_version()
+    """)
@@ -0,0 +1,70 @@
+"""
+Append-only per-user activity timeline behind GET /api/reports/activity,
+which used to UNION a reservations join with a tools scan and sort a
+user's whole history on every request. Statement-level triggers append
+a row per created tool (for its owner) and per reservation (for the
+renter); rows go away with their tool, reservation or user. Pages are
+index range scans on (user_id, occurred_at, id).
+"""
+
+BACKFILL_TOOLS = """
+    INSERT INTO user_activity (user_id, tool_id, kind, occurred_at)
+    SELECT owner_id, id, 'Owned', created_at::date FROM tools
+    WHERE owner_id IS NOT NULL AND id >= %(start)s AND id < %(end)s
+    ON CONFLICT DO NOTHING
+"""
+
+BACKFILL_RESERVATIONS = """
+    INSERT INTO user_activity (user_id, tool_id, reservation_id, kind, occurred_at)
+    SELECT renter_id, tool_id, id, 'Rented', start_date FROM reservations
+    WHERE renter_id IS NOT NULL AND tool_id IS NOT NULL AND id >= %(start)s AND id < %(end)s
+    ON CONFLICT DO NOTHING
+"""
+
+def upgrade(m):
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS user_activity (
+            id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            tool_id INTEGER NOT NULL REFERENCES tools(id) ON DELETE CASCADE,
+            reservation_id INTEGER REFERENCES reservations(id) ON DELETE CASCADE,
+            kind VARCHAR(10) NOT NULL CHECK (kind IN ('Owned', 'Rented')),
+            occurred_at DATE NOT NULL
+        )
+    """)
+    # Scanned backwards for the newest-first pages
+    m.create_index("idx_user_activity_timeline", "user_activity", ["user_id", "occurred_at", "id"])
+    # One row per source, so the backfill below can run alongside the triggers
+    m.create_index("idx_user_activity_reservation", "user_activity", ["reservation_id"], unique=True)
+    m.create_index("idx_user_activity_tool_owned", "user_activity", ["tool_id"], unique=True, where="reservation_id IS NULL")
+    # For the ON DELETE CASCADE from tools
+    m.create_index("idx_user_activity_tool_id", "user_activity", ["tool_id"])
+
+    m.execute("""
+        CREATE OR REPLACE FUNCTION func_record_activity()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'tools' THEN
+                INSERT INTO user_activity (user_id, tool_id, kind, occurred_at)
+                SELECT owner_id, id, 'Owned', created_at::date FROM new_rows
+                WHERE owner_id IS NOT NULL;
+            ELSE
+                INSERT INTO user_activity (user_id, tool_id, reservation_id, kind, occurred_at)
+                SELECT renter_id, tool_id, id, 'Rented', start_date FROM new_rows
+                WHERE renter_id IS NOT NULL AND tool_id IS NOT NULL;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in ("tools", "reservations"):
+        m.execute(f"DROP TRIGGER IF EXISTS trg_activity_{table} ON {table}")
+        m.execute(f"""
+            CREATE TRIGGER trg_activity_{table}
+            AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION func_record_activity()
+        """)
+
+    # Rows written before the triggers existed, in committed id ranges
+    m.backfill_insert("tools", BACKFILL_TOOLS)
+    m.backfill_insert("reservations", BACKFILL_RESERVATIONS)
@@ -0,0 +1,35 @@
+"""
+Owner leaderboard behind GET /api/reports/stats: per owner rating average
+(from the owner_rating_stats counters), distinct tool count, rental count
+and completed revenue, precomputed in a materialized view so the report is
+an index scan instead of a join over every tool and reservation.
+leaderboard.py refreshes it CONCURRENTLY on a schedule; the unique index
+on owner_id is what allows that.
+"""
+
+def upgrade(m):
+    m.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS owner_leaderboard AS
+        SELECT u.id AS owner_id,
+               u.name,
+               COALESCE(o.rating_sum::float / NULLIF(o.rating_count, 0), 0) AS avg_rating,
+               COALESCE(o.rating_count, 0) AS review_count,
+               t.tool_count,
+               COALESCE(r.rental_count, 0) AS rental_count,
+               COALESCE(r.revenue, 0) AS revenue,
+               now() AS refreshed_at
+        FROM users u
+        JOIN (SELECT owner_id, COUNT(*) AS tool_count FROM tools GROUP BY owner_id) t ON t.owner_id = u.id
+        LEFT JOIN owner_rating_stats o ON o.owner_id = u.id
+        LEFT JOIN (
+            SELECT tl.owner_id,
+                   COUNT(*) FILTER (WHERE res.status IN ('approved', 'completed')) AS rental_count,
+                   SUM(res.total_price) FILTER (WHERE res.status = 'completed') AS revenue
+            FROM reservations res
+            JOIN tools tl ON tl.id = res.tool_id
+            GROUP BY tl.owner_id
+        ) r ON r.owner_id = u.id
+    """)
+    m.create_index("idx_owner_leaderboard_owner_id", "owner_leaderboard", ["owner_id"], unique=True)
+    # Scanned backwards for the top-N, best rated first
+    m.create_index("idx_owner_leaderboard_rank", "owner_leaderboard", ["avg_rating", "review_count", "owner_id"])
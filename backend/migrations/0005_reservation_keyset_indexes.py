@@ -0,0 +1,15 @@
+"""
+Indexes matching the keyset order of GET /api/reservations
+(start_date DESC, id DESC) for each of its branches: the renter side,
+the renter side for one tool, and the owner side / tool filter through
+tool_id. Each page is an index range scan instead of a full join filtered
+by an OR. The plain foreign key indexes from 0001 are prefixes of these
+and are dropped once the new ones exist.
+"""
+
+def upgrade(m):
+    m.create_index("idx_reservations_renter_start", "reservations", ["renter_id", "start_date", "id"])
+    m.create_index("idx_reservations_renter_tool_start", "reservations", ["renter_id", "tool_id", "start_date", "id"])
+    m.create_index("idx_reservations_tool_start", "reservations", ["tool_id", "start_date", "id"])
+    m.drop_index("idx_reservations_renter_id")
+    m.drop_index("idx_reservations_tool_id")
@@ -0,0 +1,7 @@
+"""
+The 'bio' column PUT /api/users/me and the profile page have always written
+but no schema created, so every profile update failed.
+"""
+
+def upgrade(m):
+    m.add_column("users", "bio", "TEXT")
@@ -0,0 +1,34 @@
+"""
+Moves the owner leaderboard's refresh time out of the view. Every row of
+'owner_leaderboard' carried now() AS refreshed_at, so each REFRESH
+CONCURRENTLY found every row changed and rewrote the whole view. The time
+now lives in the one-row 'leaderboard_refresh' table that leaderboard.py
+stamps after a refresh. Rental count and revenue go too: GET
+/api/reports/stats is readable by any user and only ever showed name,
+rating and tool count.
+"""
+
+def upgrade(m):
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_refresh (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # One transaction: readers keep the old view until the new one is indexed
+    m.execute("""
+        DROP MATERIALIZED VIEW IF EXISTS owner_leaderboard;
+        CREATE MATERIALIZED VIEW owner_leaderboard AS
+        SELECT u.id AS owner_id,
+               u.name,
+               COALESCE(o.rating_sum::float / NULLIF(o.rating_count, 0), 0) AS avg_rating,
+               COALESCE(o.rating_count, 0) AS review_count,
+               t.tool_count
+        FROM users u
+        JOIN (SELECT owner_id, COUNT(*) AS tool_count FROM tools GROUP BY owner_id) t ON t.owner_id = u.id
+        LEFT JOIN owner_rating_stats o ON o.owner_id = u.id;
+        CREATE UNIQUE INDEX idx_owner_leaderboard_owner_id ON owner_leaderboard (owner_id);
+        CREATE INDEX idx_owner_leaderboard_rank ON owner_leaderboard (avg_rating, review_count, owner_id);
+        INSERT INTO leaderboard_refresh (id, refreshed_at) VALUES (TRUE, CURRENT_TIMESTAMP)
+        ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+    """)
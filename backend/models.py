@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date
+from decimal import Decimal
 
 # --- Auth Models ---
 class UserRegister(BaseModel):
@@ -32,11 +33,14 @@ class UserPasswordUpdate(BaseModel):
 
 # --- Tool Models ---
 class ToolCreate(BaseModel):
-    name: str
+    # Limits mirror the tools table, so bulk imports can report bad rows
+    # individually instead of failing the whole COPY
+    name: str = Field(..., min_length=1, max_length=100)
     description: str
-    daily_price: float
-    category: str
-    image_url: Optional[str] = None
+    # DECIMAL(10, 2): more places would be rounded by Postgres, possibly to 0
+    daily_price: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2)
+    category: str = Field(..., max_length=50)
+    image_url: Optional[str] = Field(None, max_length=255)
 
 class ToolUpdate(BaseModel):
     name: Optional[str] = None
@@ -55,6 +59,17 @@ class ReservationCreate(BaseModel):
 class ReservationStatusUpdate(BaseModel):
     status: str
 
+# Tool and date combinations priced by one POST /api/reservations/quotes
+QUOTE_BATCH_MAX = 200
+
+class PriceQuoteRequest(BaseModel):
+    tool_id: int
+    start_date: date
+    end_date: date
+
+class PriceQuoteBatch(BaseModel):
+    quotes: List[PriceQuoteRequest] = Field(..., min_length=1, max_length=QUOTE_BATCH_MAX)
+
 # --- Review Models ---
 class ReviewCreate(BaseModel):
     reservation_id: int
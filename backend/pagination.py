@@ -0,0 +1,108 @@
+import base64
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, Response
+from database import fetch_pipelined
+
+# Page size limits for every list endpoint
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Count-Estimate"
+
+class PageParams:
+    """
+    Query parameters shared by all keyset-paginated endpoints.
+    Use as `page: PageParams = Depends()`.
+    """
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+        include_total: bool = Query(False, description="Add an estimated total row count header"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def _plan_rows(explain_row) -> int:
+    """Planner row estimate from an EXPLAIN (FORMAT JSON) row; no COUNT(*) needed."""
+    return int(explain_row["QUERY PLAN"][0]["Plan"]["Plan Rows"])
+
+async def fetch_page(
+    conn,
+    response: Response,
+    page: PageParams,
+    select: str,
+    keys: List[Tuple[str, str]],
+    filters: Optional[List[str]] = None,
+    params: Optional[list] = None,
+    descending: bool = True,
+):
+    """
+    Runs `select` with keyset pagination and returns one page of rows.
+
+    `keys` lists the ordering columns as (sql expression, result column) pairs
+    and must end with a unique column so the order is total. The keys should be
+    backed by an index so every page is an index range scan, whatever its depth.
+    The cursor for the following page is sent in the X-Next-Cursor header.
+    With include_total the count estimate is pipelined with the page query.
+    """
+    filters = list(filters or [])
+    params = list(params or [])
+    where = f" WHERE {' AND '.join(filters)}" if filters else ""
+
+    statements = []
+    if page.include_total:
+        statements.append((f"EXPLAIN (FORMAT JSON) {select}{where}", list(params)))
+
+    if page.cursor:
+        after = decode_cursor(page.cursor, len(keys))
+        columns = ", ".join(expr for expr, _ in keys)
+        placeholders = ", ".join(["%s"] * len(keys))
+        filters.append(f"({columns}) {'<' if descending else '>'} ({placeholders})")
+        params.extend(after)
+        where = f" WHERE {' AND '.join(filters)}"
+
+    direction = "DESC" if descending else "ASC"
+    order_by = ", ".join(f"{expr} {direction}" for expr, _ in keys)
+    query = f"{select}{where} ORDER BY {order_by} LIMIT %s"
+    params.append(page.limit + 1)
+
+    statements.append((query, params))
+    results = await fetch_pipelined(conn, *statements)
+    rows = results[-1]
+
+    if page.include_total:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(_plan_rows(results[0][0]))
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last[column] for _, column in keys])
+    return rows
@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable
+from database import connection
+from cache import price_cache, tool_tag
+
+def quote(daily_price: Decimal, start_date: date, end_date: date) -> Decimal:
+    """
+    Same result as the SQL function func_calculate_price: the daily price
+    times the number of days, both ends included.
+    """
+    return daily_price * ((end_date - start_date).days + 1)
+
+async def daily_prices(tool_ids: Iterable[int]) -> Dict[int, Decimal]:
+    """
+    tools.daily_price by tool id, from the price cache; all misses are
+    loaded in one query. Unknown ids are left out. Entries carry the tool's
+    cache tag, so update_tool and delete_tool invalidate them.
+    """
+    prices = {}
+    missing = []
+    for tool_id in set(tool_ids):
+        price = price_cache.get(tool_id)
+        if price is None:
+            missing.append(tool_id)
+        else:
+            prices[tool_id] = price
+
+    if missing:
+        generation = price_cache.generation
+        async with connection() as conn:
+            cur = conn.cursor()
+            await cur.execute("SELECT id, daily_price FROM tools WHERE id = ANY(%s)", (missing,))
+            for row in await cur.fetchall():
+                price = prices[row['id']] = row['daily_price']
+                price_cache.set(row['id'], price, [tool_tag(row['id'])], generation)
+    return prices
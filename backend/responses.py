@@ -0,0 +1,43 @@
+from decimal import Decimal
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+def _default(value: Any):
+    # NUMERIC columns (prices, revenue) stay exact Decimals in Python and
+    # only become JSON numbers here, as jsonable_encoder rendered them
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class JSONResponse(ORJSONResponse):
+    """orjson rendering; dates and datetimes are encoded natively as ISO 8601."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> JSONResponse:
+    """
+    Returns rows straight from psycopg as JSON, skipping FastAPI's
+    jsonable_encoder pass and any response_model validation.
+    Headers already set on the injected `response` (pagination headers) are
+    carried over, since FastAPI ignores it when a Response is returned.
+    """
+    result = JSONResponse(content, status_code=status_code)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name.lower() not in ("content-length", "content-type"):
+                result.headers[name] = value
+    return result
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified(response: Response) -> Response:
+    """304 carrying the ETag and Cache-Control already set on `response`."""
+    headers = {name: value for name, value in response.headers.items() if name.lower() in ("etag", "cache-control")}
+    return Response(status_code=304, headers=headers)
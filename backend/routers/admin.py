@@ -1,103 +1,146 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from dependencies import get_db_connection, get_current_admin_user
+from pagination import PageParams, fetch_page
+from cache import catalog_cache, auth_cache, price_cache, invalidate, ALL_TAG
+from export import EXPORTS, MEDIA_TYPES, stream_export
+from slow_queries import recent_slow_queries
+from responses import json_response
 import psycopg
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 @router.get("/users")
-def get_all_users(admin_id: int = Depends(get_current_admin_user)):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, email, role, created_at, security_score FROM users ORDER BY id")
-        users = cur.fetchall()
-        return users
-    finally:
-        conn.close()
+async def get_all_users(response: Response, page: PageParams = Depends(), admin_id: int = Depends(get_current_admin_user), conn=Depends(get_db_connection)):
+    users = await fetch_page(
+        conn, response, page,
+        select="SELECT id, name, email, role, created_at, security_score FROM users",
+        keys=[("id", "id")],
+        descending=False,
+    )
+    return json_response(users, response)
 
 @router.get("/tools")
-def get_all_tools_admin(admin_id: int = Depends(get_current_admin_user)):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        query = """
+async def get_all_tools_admin(response: Response, page: PageParams = Depends(), admin_id: int = Depends(get_current_admin_user), conn=Depends(get_db_connection)):
+    tools = await fetch_page(
+        conn, response, page,
+        select="""
             SELECT t.id, t.name, t.category, t.daily_price, t.status, u.name as owner_name, u.email as owner_email
             FROM tools t
             JOIN users u ON t.owner_id = u.id
-            ORDER BY t.id DESC
-        """
-        cur.execute(query)
-        tools = cur.fetchall()
-        return tools
-    finally:
-        conn.close()
+        """,
+        keys=[("t.id", "id")],
+    )
+    return json_response(tools, response)
+
+@router.get("/export/{table}")
+async def export_table(table: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$"), admin_id: int = Depends(get_current_admin_user)):
+    """
+    Streams a full dump of users, tools or reservations as NDJSON or CSV.
+    """
+    if table not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    return StreamingResponse(
+        stream_export(table, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
 
 @router.delete("/users/{user_id}")
-def delete_user(user_id: int, admin_id: int = Depends(get_current_admin_user)):
-    conn = get_db_connection()
+async def delete_user(user_id: int, admin_id: int = Depends(get_current_admin_user), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         if user_id == admin_id:
              raise HTTPException(status_code=400, detail="Cannot delete yourself")
              
-        cur.execute("DELETE FROM users WHERE id = %s RETURNING id", (user_id,))
-        if not cur.fetchone():
+        await cur.execute("DELETE FROM users WHERE id = %s RETURNING id", (user_id,))
+        if not await cur.fetchone():
             raise HTTPException(status_code=404, detail="User not found")
-        conn.commit()
+        # Cascades to the user's tools, reservations and reviews
+        await invalidate(conn, ALL_TAG)
+        await conn.commit()
         return {"message": "User deleted"}
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.get("/stats")
-def get_global_stats(admin_id: int = Depends(get_current_admin_user)):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        
-        cur.execute("SELECT COUNT(*) as count FROM users")
-        user_count = cur.fetchone()['count']
-        
-        cur.execute("SELECT COUNT(*) as count FROM tools")
-        tool_count = cur.fetchone()['count']
-        
-        cur.execute("SELECT COUNT(*) as count FROM reservations")
-        res_count = cur.fetchone()['count']
-        
-        cur.execute("SELECT COALESCE(SUM(total_price), 0) as total FROM reservations WHERE status='completed'")
-        revenue = cur.fetchone()['total']
-        
-        return {
-            "total_users": user_count,
-            "total_tools": tool_count,
-            "total_reservations": res_count,
-            "total_revenue": revenue,
-            "system_status": "Operational" 
-        }
-    finally:
-        conn.close()
+async def get_global_stats(estimate: bool = False, admin_id: int = Depends(get_current_admin_user), conn=Depends(get_db_connection)):
+    """
+    Dashboard totals in a single read of the 'stats_counters' summary table,
+    which triggers keep transactionally up to date (each counter is the sum
+    of its slot rows).
+    With estimate=true the row counts come from the planner statistics
+    (pg_class.reltuples) instead, which is cheaper still on very large tables
+    but only as fresh as the last ANALYZE.
+    """
+    cur = conn.cursor()
+    if estimate:
+        await cur.execute("""
+            SELECT c.name, c.value, c.updated_at, pc.reltuples as estimate,
+                   GREATEST(st.last_analyze, st.last_autoanalyze)::timestamp as analyzed_at
+            FROM (SELECT name, SUM(value) as value, MAX(updated_at) as updated_at FROM stats_counters GROUP BY name) c
+            LEFT JOIN pg_class pc ON pc.oid = to_regclass(c.name)
+            LEFT JOIN pg_stat_user_tables st ON st.relid = pc.oid
+        """)
+    else:
+        await cur.execute("SELECT name, SUM(value) as value, MAX(updated_at) as updated_at FROM stats_counters GROUP BY name")
+    counters = {row['name']: row for row in await cur.fetchall()}
+
+    def total(name):
+        row = counters.get(name)
+        if not row:
+            return 0
+        # reltuples is -1 until the table has been analyzed once
+        if estimate and row['estimate'] is not None and row['estimate'] >= 0:
+            return int(row['estimate'])
+        return int(row['value'])
+
+    if estimate:
+        freshness = [row['analyzed_at'] or row['updated_at'] for name, row in counters.items() if name != 'completed_revenue']
+    else:
+        freshness = [row['updated_at'] for row in counters.values()]
+
+    return {
+        "total_users": total('users'),
+        "total_tools": total('tools'),
+        "total_reservations": total('reservations'),
+        "total_revenue": counters['completed_revenue']['value'] if 'completed_revenue' in counters else 0,
+        "source": "estimate" if estimate else "counters",
+        "as_of": max(freshness) if freshness else None,
+        "system_status": "Operational" 
+    }
+
+@router.get("/cache")
+async def get_cache_stats(admin_id: int = Depends(get_current_admin_user)):
+    """
+    Hit / miss / eviction counters of this worker's caches.
+    """
+    return {"catalog": catalog_cache.stats(), "auth": auth_cache.stats(), "price": price_cache.stats()}
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = Query(50, ge=1, le=1000), admin_id: int = Depends(get_current_admin_user)):
+    """
+    Most recent slow statement captures of this worker's log, newest first,
+    with redacted parameters and their EXPLAIN plan.
+    """
+    return await recent_slow_queries(limit)
 
 @router.get("/activity")
-def get_recent_activity(admin_id: int = Depends(get_current_admin_user)):
+async def get_recent_activity(admin_id: int = Depends(get_current_admin_user), conn=Depends(get_db_connection)):
     """
     New feature: admin activity feed.
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        # Get last 5 reservations
-        cur.execute("""
-            SELECT 'Reservation' as type, u.name as actor, t.name as target, r.created_at
-            FROM reservations r
-            JOIN users u ON r.renter_id = u.id
-            JOIN tools t ON r.tool_id = t.id
-            ORDER BY r.created_at DESC LIMIT 5
-        """)
-        recent = cur.fetchall()
-        return recent
-    finally:
-        conn.close()
+    cur = conn.cursor()
+    # Get last 5 reservations
+    await cur.execute("""
+        SELECT 'Reservation' as type, u.name as actor, t.name as target, r.created_at
+        FROM reservations r
+        JOIN users u ON r.renter_id = u.id
+        JOIN tools t ON r.tool_id = t.id
+        ORDER BY r.created_at DESC LIMIT 5
+    """)
+    recent = await cur.fetchall()
+    return json_response(recent)
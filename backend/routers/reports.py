@@ -1,55 +1,75 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
+from datetime import date
 from dependencies import get_db_connection, get_current_user_id
+from pagination import PageParams, fetch_page
+from responses import json_response
 import psycopg
 
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
+LEADERBOARD_DEFAULT_LIMIT = 50
+LEADERBOARD_MAX_LIMIT = 500
+
 @router.get("/activity")
-def get_activity_report(current_user_id: int = Depends(get_current_user_id)):
+async def get_activity_report(
+    response: Response,
+    page: PageParams = Depends(),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user_id: int = Depends(get_current_user_id),
+    conn=Depends(get_db_connection),
+):
     """
-    Requirement 9: Union usage.
+    Tools the user rented (by start date) and listed (by creation date),
+    newest first, from the 'user_activity' timeline the tools and
+    reservations triggers append to. Keyset paginated, optionally limited
+    to a date range (both ends included).
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        query = """
-            SELECT name, 'Rented' as type, start_date as date FROM reservations r 
-            JOIN tools t ON r.tool_id = t.id 
-            WHERE r.renter_id = %s
-            
-            UNION
-            
-            SELECT name, 'Owned' as type, created_at::date as date FROM tools 
-            WHERE owner_id = %s
-            
-            ORDER BY date DESC
-        """
-        cur.execute(query, (current_user_id, current_user_id))
-        results = cur.fetchall()
-        return results
-    finally:
-        conn.close()
+    filters = ["a.user_id = %s"]
+    params = [current_user_id]
+    if date_from:
+        filters.append("a.occurred_at >= %s")
+        params.append(date_from)
+    if date_to:
+        filters.append("a.occurred_at <= %s")
+        params.append(date_to)
+
+    activity = await fetch_page(
+        conn, response, page,
+        select="""
+            SELECT a.id, t.name, a.kind as type, a.occurred_at as date
+            FROM user_activity a
+            JOIN tools t ON t.id = a.tool_id
+        """,
+        keys=[("a.occurred_at", "date"), ("a.id", "id")],
+        filters=filters,
+        params=params,
+    )
+    return json_response(activity, response)
 
 @router.get("/stats")
-def get_stats_report(current_user_id: int = Depends(get_current_user_id)):
+async def get_stats_report(
+    min_rating: float = Query(4.0, ge=0, le=5, description="Only owners rated above this on average"),
+    min_reviews: int = Query(1, ge=1, description="Only owners with at least this many ratings"),
+    limit: int = Query(LEADERBOARD_DEFAULT_LIMIT, ge=1, le=LEADERBOARD_MAX_LIMIT),
+    current_user_id: int = Depends(get_current_user_id),
+    conn=Depends(get_db_connection),
+):
     """
     Requirement 10: Aggregate functions + Having.
+    Top owners by average rating, read from the 'owner_leaderboard'
+    materialized view (rating average and tool count), which leaderboard.py
+    refreshes every few minutes. Best rated first; an index scan that stops
+    after `limit` rows.
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        query = """
-            SELECT u.name, AVG(r.rating) as avg_rating, COUNT(t.id) as tool_count
-            FROM users u
-            JOIN tools t ON u.id = t.owner_id
-            JOIN reservations res ON t.id = res.tool_id
-            JOIN reviews r ON res.id = r.reservation_id
-            GROUP BY u.id, u.name
-            HAVING AVG(r.rating) > 4.0
-            ORDER BY avg_rating DESC
-        """
-        cur.execute(query)
-        results = cur.fetchall()
-        return results
-    finally:
-        conn.close()
+    cur = conn.cursor()
+    await cur.execute("""
+        SELECT name, avg_rating, tool_count
+        FROM owner_leaderboard
+        WHERE avg_rating > %s AND review_count >= %s
+        ORDER BY avg_rating DESC, review_count DESC, owner_id DESC
+        LIMIT %s
+    """, (min_rating, min_reviews, limit))
+    results = await cur.fetchall()
+    return json_response(results)
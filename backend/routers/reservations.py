@@ -1,46 +1,61 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import Optional
 from datetime import date
-from models import ReservationCreate, ReservationStatusUpdate, ReviewCreate
+from models import ReservationCreate, ReservationStatusUpdate, ReviewCreate, PriceQuoteBatch
 from dependencies import get_db_connection, get_current_user_id
+from pagination import PageParams, fetch_page
+from cache import invalidate, CATALOG_TAG, tool_tag
+from responses import json_response
+from pricing import daily_prices, quote
 import psycopg
 
 router = APIRouter(prefix="/api", tags=["Reservations"])
 
+UNAVAILABLE_MESSAGE = "Tool is not available for these dates"
+
 @router.get("/reservations/price")
-def calculate_price(tool_id: int, start_date: str, end_date: str):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        # 1. Get daily price
-        cur.execute("SELECT daily_price FROM tools WHERE id = %s", (tool_id,))
-        tool = cur.fetchone()
-        if not tool:
-            raise HTTPException(status_code=404, detail="Tool not found")
-        
-        # 2. Call SQL Function
-        cur.execute("SELECT func_calculate_price(%s, %s, %s)", (tool['daily_price'], start_date, end_date))
-        result = cur.fetchone()
-        return {"total_price": result['func_calculate_price']}
-    except Exception as e:
-         raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        conn.close()
+async def calculate_price(tool_id: int, start_date: date, end_date: date):
+    """
+    Quoted in Python like func_calculate_price, against the cached daily
+    price; the database is only asked on a cache miss.
+    """
+    prices = await daily_prices([tool_id])
+    if tool_id not in prices:
+        raise HTTPException(status_code=404, detail="Tool not found")
+    return {"total_price": quote(prices[tool_id], start_date, end_date)}
+
+@router.post("/reservations/quotes")
+async def calculate_prices(batch: PriceQuoteBatch):
+    """
+    Prices many tool and date range combinations at once, in request order.
+    Unknown tools get a null total_price and an error instead of failing
+    the whole batch.
+    """
+    prices = await daily_prices(item.tool_id for item in batch.quotes)
+    quotes = []
+    for item in batch.quotes:
+        result = {"tool_id": item.tool_id, "start_date": item.start_date, "end_date": item.end_date}
+        if item.tool_id in prices:
+            result["total_price"] = quote(prices[item.tool_id], item.start_date, item.end_date)
+        else:
+            result["total_price"] = None
+            result["error"] = "Tool not found"
+        quotes.append(result)
+    return {"quotes": quotes}
 
 @router.put("/reservations/{reservation_id}/status")
-async def update_reservation_status(reservation_id: int, status_update: ReservationStatusUpdate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def update_reservation_status(reservation_id: int, status_update: ReservationStatusUpdate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         
         # Verify ownership
-        cur.execute("""
+        await cur.execute("""
             SELECT t.owner_id 
             FROM reservations r
             JOIN tools t ON r.tool_id = t.id
             WHERE r.id = %s
         """, (reservation_id,))
-        result = cur.fetchone()
+        result = await cur.fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Reservation not found")
@@ -50,23 +65,26 @@ async def update_reservation_status(reservation_id: int, status_update: Reservat
              raise HTTPException(status_code=403, detail="Not authorized to update this reservation")
 
         # Update status
-        cur.execute("""
+        await cur.execute("""
             UPDATE reservations 
             SET status = %s
             WHERE id = %s
         """, (status_update.status, reservation_id))
-        conn.commit()
+        await conn.commit()
         
         return {"message": "Reservation status updated", "status": status_update.status}
+    except HTTPException:
+        raise
+    except psycopg.errors.ExclusionViolation:
+        # Re-activating a booking that now overlaps another one
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail=f"Reservation failed: {UNAVAILABLE_MESSAGE}")
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.post("/reservations")
-async def create_reservation(reservation: ReservationCreate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def create_reservation(reservation: ReservationCreate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         
@@ -76,69 +94,123 @@ async def create_reservation(reservation: ReservationCreate, current_user_id: in
         if reservation.end_date < reservation.start_date:
              raise HTTPException(status_code=400, detail="End date must be after start date")
 
-        cur.execute("SELECT daily_price, owner_id FROM tools WHERE id = %s", (reservation.tool_id,))
-        tool = cur.fetchone()
-        if not tool:
-            raise HTTPException(status_code=404, detail="Tool not found")
-            
-        if tool['owner_id'] == current_user_id:
-            raise HTTPException(status_code=400, detail="You cannot reserve your own tool")
- 
-        cur.execute(
+        # Tool lookup and INSERT in one round trip; the insert only happens
+        # when the tool exists and belongs to someone else
+        await cur.execute(
             """
-            INSERT INTO reservations (tool_id, renter_id, start_date, end_date, total_price)
-            VALUES (%s, %s, %s, %s, func_calculate_price(%s, %s, %s))
-            RETURNING id, status, total_price
+            WITH tool AS (
+                SELECT id, daily_price, owner_id FROM tools WHERE id = %(tool_id)s
+            ), new_res AS (
+                INSERT INTO reservations (tool_id, renter_id, start_date, end_date, total_price)
+                SELECT id, %(renter_id)s, %(start_date)s, %(end_date)s, func_calculate_price(daily_price, %(start_date)s, %(end_date)s)
+                FROM tool
+                WHERE owner_id <> %(renter_id)s
+                RETURNING id, status, total_price
+            )
+            SELECT new_res.id, new_res.status, new_res.total_price
+            FROM tool LEFT JOIN new_res ON true
             """,
-            (reservation.tool_id, current_user_id, reservation.start_date, reservation.end_date, tool['daily_price'], reservation.start_date, reservation.end_date)
+            {"tool_id": reservation.tool_id, "renter_id": current_user_id,
+             "start_date": reservation.start_date, "end_date": reservation.end_date}
         )
-        new_res = cur.fetchone()
-        conn.commit()
+        new_res = await cur.fetchone()
+        if not new_res:
+            raise HTTPException(status_code=404, detail="Tool not found")
+        if new_res['id'] is None:
+            raise HTTPException(status_code=400, detail="You cannot reserve your own tool")
+        await conn.commit()
         return new_res
-    except psycopg.errors.RaiseException as e:
-        conn.rollback()
-        raise HTTPException(status_code=400, detail=f"Reservation failed: {e.diag.message_primary}")
+    except HTTPException:
+        raise
+    except psycopg.errors.ExclusionViolation:
+        # reservations_no_overlap: another active booking covers these dates
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail=f"Reservation failed: {UNAVAILABLE_MESSAGE}")
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         print(f"Res Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+
+RESERVATION_COLUMNS = """
+    r.id, r.tool_id, t.name as tool_name, r.start_date, r.end_date, r.total_price, r.status,
+    t.owner_id as tool_owner_id,
+    u_renter.name as renter_name,
+    r.renter_id
+"""
+
+RESERVATION_JOINS = """
+    FROM reservations r
+    JOIN tools t ON r.tool_id = t.id
+    JOIN users u_renter ON r.renter_id = u_renter.id
+"""
 
 @router.get("/reservations")
-def get_my_reservations(current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT r.id, r.tool_id, t.name as tool_name, r.start_date, r.end_date, r.total_price, r.status, 
-                   t.owner_id as tool_owner_id, 
-                   u_renter.name as renter_name,
-                   r.renter_id
-            FROM reservations r
-            JOIN tools t ON r.tool_id = t.id
-            JOIN users u_renter ON r.renter_id = u_renter.id
-            WHERE r.renter_id = %s OR t.owner_id = %s
-            ORDER BY r.start_date DESC
-        """, (current_user_id, current_user_id))
-        reservations = cur.fetchall()
-        return reservations
-    finally:
-        conn.close()
+async def get_my_reservations(
+    response: Response,
+    page: PageParams = Depends(),
+    role: str = Query("all", pattern="^(all|renter|owner)$", description="Reservations made by the user, of the user's tools, or both"),
+    status: Optional[str] = Query(None, pattern="^(pending|approved|rejected|completed|cancelled)$"),
+    tool_id: Optional[int] = None,
+    date_from: Optional[date] = Query(None, description="Only reservations ending on or after this date"),
+    date_to: Optional[date] = Query(None, description="Only reservations starting on or before this date"),
+    current_user_id: int = Depends(get_current_user_id),
+    conn=Depends(get_db_connection),
+):
+    """
+    The user's reservations as renter and / or as owner, newest start date
+    first. Each side is its own branch of a UNION ALL, so each is an index
+    range scan on its own column (migrations/0005) instead of a join of
+    everything to evaluate an OR across two tables. The outer filters are
+    pushed down into both branches.
+    """
+    branches = []
+    params = []
+    if role in ("all", "renter"):
+        branches.append(f"SELECT {RESERVATION_COLUMNS} {RESERVATION_JOINS} WHERE r.renter_id = %s")
+        params.append(current_user_id)
+    if role in ("all", "owner"):
+        # Both sides at once: a reservation of one's own tool is listed once, as renter
+        own = " AND r.renter_id <> %s" if role == "all" else ""
+        branches.append(f"SELECT {RESERVATION_COLUMNS} {RESERVATION_JOINS} WHERE t.owner_id = %s{own}")
+        params.append(current_user_id)
+        if own:
+            params.append(current_user_id)
+
+    filters = []
+    if status:
+        filters.append("r.status = %s")
+        params.append(status)
+    if tool_id is not None:
+        filters.append("r.tool_id = %s")
+        params.append(tool_id)
+    if date_from:
+        filters.append("r.end_date >= %s")
+        params.append(date_from)
+    if date_to:
+        filters.append("r.start_date <= %s")
+        params.append(date_to)
+
+    reservations = await fetch_page(
+        conn, response, page,
+        select=f"SELECT * FROM ({' UNION ALL '.join(branches)}) r",
+        keys=[("r.start_date", "start_date"), ("r.id", "id")],
+        filters=filters,
+        params=params,
+    )
+    return json_response(reservations, response)
 
 @router.post("/reviews")
-def create_review(review: ReviewCreate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def create_review(review: ReviewCreate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         
         # Verify reservation belongs to user (renter)
-        cur.execute("SELECT renter_id FROM reservations WHERE id = %s", (review.reservation_id,))
-        res = cur.fetchone()
+        await cur.execute("SELECT renter_id, tool_id FROM reservations WHERE id = %s", (review.reservation_id,))
+        res = await cur.fetchone()
         if not res or res['renter_id'] != current_user_id:
              raise HTTPException(status_code=403, detail="Not authorized")
 
-        cur.execute(
+        await cur.execute(
             """
             INSERT INTO reviews (reservation_id, rating, comment)
             VALUES (%s, %s, %s)
@@ -146,11 +218,11 @@ def create_review(review: ReviewCreate, current_user_id: int = Depends(get_curre
             """,
             (review.reservation_id, review.rating, review.comment)
         )
-        new_review = cur.fetchone()
-        conn.commit()
+        new_review = await cur.fetchone()
+        # Tool rating and reviews change; so does the owner score shown in the catalog
+        await invalidate(conn, CATALOG_TAG, tool_tag(res['tool_id']))
+        await conn.commit()
         return new_review
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
@@ -1,65 +1,118 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 from models import ToolCreate, ToolUpdate, ReviewCreate
-from dependencies import get_db_connection, get_current_user_id
+from dependencies import get_db_connection, get_current_user_id, get_token_claims, is_token_current, request_user_id
+from database import connection
+from pagination import PageParams, fetch_page
+from cache import cached, invalidate, CATALOG_TAG, tool_tag
+from responses import etag_matches, json_response, not_modified
+from importer import IMPORT_COLUMNS, IMPORT_FORMATS, IMPORT_MAX_ERRORS, detect_format, read_rows, validate_batch
+import csv
+import hashlib
+import os
 import psycopg
 
 router = APIRouter(prefix="/api/tools", tags=["Tools"])
 
+# Explicit column list so the generated 'search_vector' never leaks into responses
+TOOL_COLUMNS = "t.id, t.owner_id, t.name, t.description, t.daily_price, t.category, t.status, t.image_url, t.created_at"
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Anonymous catalog listings may be reused by browsers and CDNs for this long
+CATALOG_MAX_AGE_SECONDS = int(os.getenv("CATALOG_MAX_AGE_SECONDS", "15"))
+CATALOG_CACHE_CONTROL = f"public, max-age={CATALOG_MAX_AGE_SECONDS}"
+# Tool details and reviews are stored but revalidated with their ETag on every use
+TOOL_CACHE_CONTROL = "public, no-cache"
+
 @router.get("")
-def get_tools(category: Optional[str] = None):
+async def get_tools(response: Response, category: Optional[str] = None, page: PageParams = Depends()):
     """
     Fetches tools using the SQL View 'view_available_tools' as per Requirement 6.
+    Keyset paginated on the tool id. Pages are served from the catalog cache;
+    a connection is only borrowed on a miss. Cache fills read the primary:
+    a lagging replica's rows would be cached for everyone until the TTL.
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        # Use View
-        query = "SELECT * FROM view_available_tools"
-        params = []
-        
-        if category:
-            query += " WHERE category = %s"
-            params.append(category)
-        
-        cur.execute(query, params)
-        tools = cur.fetchall()
-        return tools
-    finally:
-        conn.close()
+    # Use View
+    filters = []
+    params = []
+    
+    if category:
+        filters.append("category = %s")
+        params.append(category)
+    
+    async def load():
+        async with connection() as conn:
+            return await fetch_page(
+                conn, response, page,
+                select="SELECT * FROM view_available_tools",
+                keys=[("id", "id")],
+                filters=filters,
+                params=params,
+                descending=False,
+            )
+
+    response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+    key = ("tools", category, page.limit, page.cursor, page.include_total)
+    return json_response(await cached(key, [CATALOG_TAG], load, response), response)
 
 @router.get("/search")
-def search_tools(q: str):
+async def search_tools(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    status: Optional[str] = None,
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    conn=Depends(get_db_connection),
+):
     """
-    Searches tools using the SQL Function 'func_search_tools' which returns a CURSOR 
-    as per Requirement 11 (Cursor usage).
-    Background: This function uses the Index 'idx_tool_search' (Requirement 7).
+    Ranked tool search in a single round trip.
+    Matches either the full-text document (name, category, description) through
+    the GIN index on 'search_vector', or the tool name by trigram word similarity
+    through 'idx_tool_name_trgm', which tolerates typos and partial words.
+    Results are ordered by text rank plus name similarity.
+    """
+    filters = ["(t.search_vector @@ query OR t.name %%> %(q)s)"]
+    if category:
+        filters.append("t.category = %(category)s")
+    if min_price is not None:
+        filters.append("t.daily_price >= %(min_price)s")
+    if max_price is not None:
+        filters.append("t.daily_price <= %(max_price)s")
+    if status:
+        filters.append("t.status = %(status)s")
+
+    query = f"""
+        SELECT {TOOL_COLUMNS},
+               ts_rank_cd(t.search_vector, query) + word_similarity(%(q)s, t.name) AS rank
+        FROM tools t, websearch_to_tsquery('english', %(q)s) AS query
+        WHERE {' AND '.join(filters)}
+        ORDER BY rank DESC, t.id DESC
+        LIMIT %(limit)s OFFSET %(offset)s
     """
-    conn = get_db_connection()
+    params = {
+        "q": q, "category": category, "min_price": min_price, "max_price": max_price,
+        "status": status, "limit": limit, "offset": offset,
+    }
     try:
-        # We must use a transaction block for cursors
-        with conn.transaction():
-            cur = conn.cursor()
-            # Call the function which returns a refcursor name
-            cur.execute("SELECT func_search_tools(%s)", (q,))
-            cursor_name = cur.fetchone()['func_search_tools']
-            
-            # Fetch from the returned cursor
-            cur.execute(f"FETCH ALL FROM \"{cursor_name}\"")
-            results = cur.fetchall()
-            return results
+        cur = conn.cursor()
+        await cur.execute(query, params)
+        response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+        return json_response(await cur.fetchall(), response)
     except Exception as e:
         print(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.post("")
-def create_tool(tool: ToolCreate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def create_tool(tool: ToolCreate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
-        cur.execute(
+        await cur.execute(
             """
             INSERT INTO tools (owner_id, name, description, daily_price, category, image_url, status)
             VALUES (%s, %s, %s, %s, %s, %s, 'available')
@@ -67,63 +120,162 @@ def create_tool(tool: ToolCreate, current_user_id: int = Depends(get_current_use
             """,
             (current_user_id, tool.name, tool.description, tool.daily_price, tool.category, tool.image_url)
         )
-        new_tool = cur.fetchone()
-        conn.commit()
+        new_tool = await cur.fetchone()
+        await invalidate(conn, CATALOG_TAG)
+        await conn.commit()
         return new_tool
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
-@router.get("/my")
-def get_my_tools(current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+@router.post("/import")
+async def import_tools(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    current_user_id: int = Depends(get_current_user_id),
+    conn=Depends(get_db_connection),
+):
+    """
+    Bulk import of tools from a CSV (header row) or NDJSON upload, with the
+    same fields as POST /api/tools.
+    Rows are validated with ToolCreate in one streaming pass and the valid
+    ones are COPYed into a staging table, then merged into 'tools' with a
+    single INSERT ... SELECT in the same transaction. Invalid rows are skipped
+    and listed in the report with their line number.
+    """
+    format = format or detect_format(file.filename)
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported file format, use csv or ndjson")
+
+    rows = read_rows(file.file, format)
+    errors = []
+    failed = 0
     try:
         cur = conn.cursor()
-        cur.execute("SELECT * FROM tools WHERE owner_id = %s ORDER BY id DESC", (current_user_id,))
-        tools = cur.fetchall()
-        return tools
-    finally:
-        conn.close()
+        await cur.execute("""
+            CREATE TEMP TABLE tool_import (
+                line INTEGER, name TEXT, description TEXT, daily_price NUMERIC(10, 2), category TEXT, image_url TEXT
+            ) ON COMMIT DROP
+        """)
+        async with cur.copy(f"COPY tool_import ({', '.join(IMPORT_COLUMNS)}) FROM STDIN") as copy:
+            while True:
+                valid, batch_errors = await run_in_threadpool(validate_batch, rows)
+                if not valid and not batch_errors:
+                    break
+                for row in valid:
+                    await copy.write_row(row)
+                failed += len(batch_errors)
+                errors.extend(batch_errors[:IMPORT_MAX_ERRORS - len(errors)])
+
+        await cur.execute(
+            """
+            INSERT INTO tools (owner_id, name, description, daily_price, category, image_url, status)
+            SELECT %s, name, description, daily_price, category, image_url, 'available'
+            FROM tool_import
+            ORDER BY line
+            """,
+            (current_user_id,)
+        )
+        imported = cur.rowcount
+        if imported:
+            await invalidate(conn, CATALOG_TAG)
+        await conn.commit()
+    except UnicodeDecodeError:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except csv.Error as e:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail=f"Malformed CSV: {e}")
+    except Exception as e:
+        await conn.rollback()
+        print(f"Import error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {"imported": imported, "failed": failed, "errors": errors, "errors_truncated": failed > len(errors)}
+
+@router.get("/my")
+async def get_my_tools(response: Response, page: PageParams = Depends(), current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
+    tools = await fetch_page(
+        conn, response, page,
+        select=f"SELECT {TOOL_COLUMNS} FROM tools t",
+        keys=[("t.id", "id")],
+        filters=["t.owner_id = %s"],
+        params=[current_user_id],
+    )
+    return json_response(tools, response)
+
+def _etag(tool_id: int, version: int, *variant) -> str:
+    """
+    Strong ETag from the tool's version counter, which triggers bump on any
+    change to the tool or its reviews; `variant` tells pages apart.
+    """
+    tag = f"{tool_id}.{version}"
+    if variant:
+        tag += "." + hashlib.md5(repr(variant).encode()).hexdigest()[:12]
+    return f'"{tag}"'
+
+async def _tool_version(conn, tool_id: int) -> int:
+    cur = conn.cursor()
+    await cur.execute("SELECT version FROM tools WHERE id = %s", (tool_id,))
+    row = await cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Tool not found")
+    return row['version']
 
 @router.get("/{tool_id}")
-def get_tool(tool_id: int):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        
-        cur.execute("SELECT * FROM tools WHERE id = %s", (tool_id,))
-        tool = cur.fetchone()
-        
-        if not tool:
-            raise HTTPException(status_code=404, detail="Tool not found")
-            
-        # Get Average Rating
-        cur.execute("""
-            SELECT AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-            FROM reviews r
-            JOIN reservations res ON r.reservation_id = res.id
-            WHERE res.tool_id = %s
-        """, (tool_id,))
-        rating_data = cur.fetchone()
-        
-        tool_dict = dict(tool)
-        tool_dict['average_rating'] = rating_data['avg_rating'] or 0
-        tool_dict['review_count'] = rating_data['review_count'] or 0
-        
-        return tool_dict
-    finally:
-        conn.close()
+async def get_tool(tool_id: int, request: Request, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Conditional GET: a matching If-None-Match costs one primary key lookup
+    of the tool version, on a replica if possible, and is answered with
+    304 Not Modified.
+    """
+    response.headers["Cache-Control"] = TOOL_CACHE_CONTROL
+    if if_none_match:
+        async with connection(readonly=True, user_id=request_user_id(request)) as conn:
+            etag = _etag(tool_id, await _tool_version(conn, tool_id))
+        if etag_matches(if_none_match, etag):
+            response.headers["ETag"] = etag
+            return not_modified(response)
+
+    async def load():
+        async with connection() as conn:
+            return await _fetch_tool(conn, tool_id)
+
+    tool = await cached(("tool", tool_id), [tool_tag(tool_id)], load)
+    # The version read along with the row, so the tag never runs ahead of the body
+    response.headers["ETag"] = _etag(tool_id, tool['version'])
+    return json_response(tool, response)
+
+async def _fetch_tool(conn, tool_id: int):
+    cur = conn.cursor()
+    
+    # Rating figures come from the counters kept by trg_update_score_after_review
+    await cur.execute(f"""
+        SELECT {TOOL_COLUMNS}, t.version,
+               COALESCE(s.rating_sum::float / NULLIF(s.rating_count, 0), 0) as average_rating,
+               COALESCE(s.rating_count, 0) as review_count,
+               json_build_object(
+                   '1', COALESCE(s.rating_1, 0), '2', COALESCE(s.rating_2, 0), '3', COALESCE(s.rating_3, 0),
+                   '4', COALESCE(s.rating_4, 0), '5', COALESCE(s.rating_5, 0)
+               ) as rating_distribution
+        FROM tools t
+        LEFT JOIN tool_rating_stats s ON s.tool_id = t.id
+        WHERE t.id = %s
+    """, (tool_id,))
+    tool = await cur.fetchone()
+    
+    if not tool:
+        raise HTTPException(status_code=404, detail="Tool not found")
+    
+    return tool
 
 @router.put("/{tool_id}")
-def update_tool(tool_id: int, tool: ToolUpdate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def update_tool(tool_id: int, tool: ToolUpdate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         # Check ownership
-        cur.execute("SELECT owner_id FROM tools WHERE id = %s", (tool_id,))
-        existing = cur.fetchone()
+        await cur.execute("SELECT owner_id FROM tools WHERE id = %s", (tool_id,))
+        existing = await cur.fetchone()
         if not existing:
             raise HTTPException(status_code=404, detail="Tool not found")
         if existing['owner_id'] != current_user_id:
@@ -155,72 +307,81 @@ def update_tool(tool_id: int, tool: ToolUpdate, current_user_id: int = Depends(g
             return {"message": "No changes provided"}
             
         params.append(tool_id)
-        query = f"UPDATE tools SET {', '.join(fields)} WHERE id = %s RETURNING *"
+        query = f"UPDATE tools t SET {', '.join(fields)} WHERE t.id = %s RETURNING {TOOL_COLUMNS}"
         
-        cur.execute(query, params)
-        updated_tool = cur.fetchone()
-        conn.commit()
+        await cur.execute(query, params)
+        updated_tool = await cur.fetchone()
+        await invalidate(conn, CATALOG_TAG, tool_tag(tool_id))
+        await conn.commit()
         return updated_tool
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.delete("/{tool_id}")
-def delete_tool(tool_id: int, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def delete_tool(tool_id: int, claims: dict = Depends(get_token_claims), conn=Depends(get_db_connection)):
+    current_user_id = int(claims["sub"])
     try:
         cur = conn.cursor()
         
-        # Check tool existence
-        cur.execute("SELECT owner_id FROM tools WHERE id = %s", (tool_id,))
-        existing = cur.fetchone()
-        if not existing:
-            raise HTTPException(status_code=404, detail="Tool not found")
+        # Common case, the owner deleting; caches are only dropped once a row is gone
+        await cur.execute("DELETE FROM tools WHERE id = %s AND owner_id = %s RETURNING id", (tool_id, current_user_id))
 
-        # Check privileges: Owner OR Admin
-        cur.execute("SELECT role FROM users WHERE id = %s", (current_user_id,))
-        user_role = cur.fetchone()['role']
+        if not await cur.fetchone():
+            # Check tool existence
+            await cur.execute("SELECT owner_id FROM tools WHERE id = %s", (tool_id,))
+            if not await cur.fetchone():
+                raise HTTPException(status_code=404, detail="Tool not found")
 
-        if existing['owner_id'] != current_user_id and user_role != 'admin':
-            raise HTTPException(status_code=403, detail="Not authorized to delete this tool")
-            
-        # Delete
-        cur.execute("DELETE FROM tools WHERE id = %s RETURNING id", (tool_id,))
-        conn.commit()
+            # Not the owner: Admin only (role from the token claims)
+            if claims.get("role") != 'admin' or not await is_token_current(claims):
+                raise HTTPException(status_code=403, detail="Not authorized to delete this tool")
+
+            await cur.execute("DELETE FROM tools WHERE id = %s", (tool_id,))
+        await invalidate(conn, CATALOG_TAG, tool_tag(tool_id))
+        await conn.commit()
         return {"message": "Tool deleted successfully", "id": tool_id}
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.get("/{tool_id}/reviews")
-def get_tool_reviews(tool_id: int):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        # Verify tool exists
-        cur.execute("SELECT id FROM tools WHERE id = %s", (tool_id,))
-        if not cur.fetchone():
-            raise HTTPException(status_code=404, detail="Tool not found")
+async def get_tool_reviews(tool_id: int, request: Request, response: Response, page: PageParams = Depends(), if_none_match: Optional[str] = Header(None)):
+    """
+    Conditional GET like get_tool; the ETag is the tool version plus the page.
+    """
+    variant = (page.limit, page.cursor, page.include_total)
+    response.headers["Cache-Control"] = TOOL_CACHE_CONTROL
+    if if_none_match:
+        async with connection(readonly=True, user_id=request_user_id(request)) as conn:
+            etag = _etag(tool_id, await _tool_version(conn, tool_id), *variant)
+        if etag_matches(if_none_match, etag):
+            response.headers["ETag"] = etag
+            return not_modified(response)
+
+    async def load():
+        async with connection() as conn:
+            # Read before the page, so the tag never runs ahead of the body; 404s too
+            version = await _tool_version(conn, tool_id)
+            # Fetch reviews for this tool, newest first
+            reviews = await fetch_page(
+                conn, response, page,
+                select="""
+                    SELECT r.id, r.rating, r.comment, r.created_at, u.name as reviewer_name
+                    FROM reviews r
+                    JOIN reservations res ON r.reservation_id = res.id
+                    JOIN users u ON res.renter_id = u.id
+                """,
+                keys=[("r.created_at", "created_at"), ("r.id", "id")],
+                filters=["res.tool_id = %s"],
+                params=[tool_id],
+            )
+            return version, reviews
 
-        # Fetch reviews for this tool
-        query = """
-            SELECT r.id, r.rating, r.comment, r.created_at, u.name as reviewer_name
-            FROM reviews r
-            JOIN reservations res ON r.reservation_id = res.id
-            JOIN users u ON res.renter_id = u.id
-            WHERE res.tool_id = %s
-            ORDER BY r.created_at DESC
-        """
-        cur.execute(query, (tool_id,))
-        reviews = cur.fetchall()
-        return reviews
-    finally:
-        conn.close()
+    version, reviews = await cached(("reviews", tool_id, *variant), [tool_tag(tool_id)], load, response)
+    response.headers["ETag"] = _etag(tool_id, version, *variant)
+    return json_response(reviews, response)
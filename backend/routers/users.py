@@ -1,80 +1,90 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional
 from models import UserUpdate, UserPasswordUpdate
-from dependencies import get_db_connection, get_current_user_id, verify_password, get_password_hash
+from dependencies import get_db_connection, get_current_user_id
+from hashing import hash_password, verify_password
+from cache import invalidate, tool_tag, CATALOG_TAG
 import psycopg
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
 @router.put("/me")
-def update_current_user(user_update: UserUpdate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def update_current_user(user_update: UserUpdate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
         
         # Check if email is taken by another user
-        cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (user_update.email, current_user_id))
-        if cur.fetchone():
+        await cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (user_update.email, current_user_id))
+        if await cur.fetchone():
             raise HTTPException(status_code=400, detail="Email already used")
 
-        cur.execute(
+        await cur.execute(
             """
-            UPDATE users 
+            UPDATE users u
             SET name = %s, email = %s, bio = %s
-            WHERE id = %s
-            RETURNING id, name, email, role, bio
+            FROM (SELECT name FROM users WHERE id = %s FOR UPDATE) previous
+            WHERE u.id = %s
+            RETURNING u.id, u.name, u.email, u.role, u.bio, previous.name as previous_name
             """,
-            (user_update.name, user_update.email, user_update.bio, current_user_id)
+            (user_update.name, user_update.email, user_update.bio, current_user_id, current_user_id)
         )
-        updated_user = cur.fetchone()
-        conn.commit()
+        updated_user = await cur.fetchone()
+        # Owner names appear in the catalog
+        tags = [CATALOG_TAG]
+        if updated_user and updated_user.pop('previous_name') != updated_user['name']:
+            # Reviewer names appear in the reviews of the tools the user reviewed;
+            # new versions so their ETags stop matching
+            await cur.execute("""
+                UPDATE tools SET version = version + 1
+                WHERE id IN (
+                    SELECT res.tool_id FROM reviews r
+                    JOIN reservations res ON r.reservation_id = res.id
+                    WHERE res.renter_id = %s
+                )
+                RETURNING id
+            """, (current_user_id,))
+            tags += [tool_tag(row['id']) for row in await cur.fetchall()]
+        await invalidate(conn, *tags)
+        await conn.commit()
         
         return updated_user
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.put("/me/password")
-def update_password(pw_update: UserPasswordUpdate, current_user_id: int = Depends(get_current_user_id)):
-    conn = get_db_connection()
+async def update_password(pw_update: UserPasswordUpdate, current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     try:
         cur = conn.cursor()
-        cur.execute("SELECT password FROM users WHERE id = %s", (current_user_id,))
-        user = cur.fetchone()
+        await cur.execute("SELECT password FROM users WHERE id = %s", (current_user_id,))
+        user = await cur.fetchone()
         
-        if not user or not verify_password(pw_update.current_password, user['password']):
+        if not user or not (await verify_password(pw_update.current_password, user['password']))[0]:
             raise HTTPException(status_code=400, detail="Incorrect current password")
             
-        hashed_new_pw = get_password_hash(pw_update.new_password)
+        hashed_new_pw = await hash_password(pw_update.new_password)
         
-        cur.execute("UPDATE users SET password = %s WHERE id = %s", (hashed_new_pw, current_user_id))
-        conn.commit()
+        await cur.execute("UPDATE users SET password = %s WHERE id = %s", (hashed_new_pw, current_user_id))
+        await conn.commit()
         
         return {"message": "Password updated successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        conn.rollback()
+        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @router.get("/me/stats")
-def get_user_stats(current_user_id: int = Depends(get_current_user_id)):
+async def get_user_stats(current_user_id: int = Depends(get_current_user_id), conn=Depends(get_db_connection)):
     """
     Requirement 11: 3rd SQL Function ('func_get_user_stats') called from interface.
     """
-    conn = get_db_connection()
     try:
         cur = conn.cursor()
-        cur.execute("SELECT * FROM func_get_user_stats(%s)", (current_user_id,))
-        stats = cur.fetchone()
+        await cur.execute("SELECT * FROM func_get_user_stats(%s)", (current_user_id,))
+        stats = await cur.fetchone()
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
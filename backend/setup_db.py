@@ -1,7 +1,13 @@
 
+import argparse
 import psycopg
 import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
+from migrate import migrate
 
 # Load params from .env (need to specify path if running from backend dir)
 load_dotenv()
@@ -37,7 +43,7 @@ def run_sql_commands(conn, commands):
                     print(f"Error executing: {command[:50]}... \n Error: {e}")
                     conn.rollback()
 
-def setup_database():
+def setup_database(scale=0, jobs=None):
     print(f"Connecting to {DATABASE_URL}...")
     try:
         conn = psycopg.connect(DATABASE_URL)
@@ -52,15 +58,34 @@ def setup_database():
         "DROP TRIGGER IF EXISTS trg_update_score_after_review ON reviews CASCADE;",
         "DROP TRIGGER IF EXISTS trg_check_availability ON reservations CASCADE;",
         "DROP FUNCTION IF EXISTS func_update_score CASCADE;",
+        "DROP FUNCTION IF EXISTS func_apply_rating CASCADE;",
+        "DROP FUNCTION IF EXISTS func_refresh_security_score CASCADE;",
+        "DROP FUNCTION IF EXISTS func_remove_reservation_ratings CASCADE;",
+        "DROP FUNCTION IF EXISTS func_remove_tool_ratings CASCADE;",
+        "DROP FUNCTION IF EXISTS func_track_row_count CASCADE;",
+        "DROP FUNCTION IF EXISTS func_add_to_counter CASCADE;",
+        "DROP FUNCTION IF EXISTS func_track_revenue CASCADE;",
+        "DROP FUNCTION IF EXISTS func_user_auth_changed CASCADE;",
         "DROP FUNCTION IF EXISTS func_check_availability CASCADE;",
         "DROP FUNCTION IF EXISTS func_search_tools CASCADE;",
         "DROP FUNCTION IF EXISTS func_calculate_price CASCADE;",
         "DROP VIEW IF EXISTS view_available_tools CASCADE;",
+        "DROP MATERIALIZED VIEW IF EXISTS owner_leaderboard;",
+        "DROP TABLE IF EXISTS leaderboard_refresh CASCADE;",
+        "DROP TABLE IF EXISTS user_activity CASCADE;",
+        "DROP TABLE IF EXISTS tool_rating_stats CASCADE;",
+        "DROP TABLE IF EXISTS owner_rating_stats CASCADE;",
+        "DROP TABLE IF EXISTS stats_counters CASCADE;",
         "DROP TABLE IF EXISTS reviews CASCADE;",
         "DROP TABLE IF EXISTS reservations CASCADE;",
         "DROP TABLE IF EXISTS tools CASCADE;",
         "DROP TABLE IF EXISTS users CASCADE;",
         "DROP SEQUENCE IF EXISTS reservation_seq CASCADE;",
+        "DROP TABLE IF EXISTS schema_migrations CASCADE;",
+
+        # Extensions
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+        "CREATE EXTENSION IF NOT EXISTS btree_gist;",
 
         # 2. Sequence (Req 8)
         "CREATE SEQUENCE reservation_seq START 1000;",
@@ -74,7 +99,9 @@ def setup_database():
             password VARCHAR(255) NOT NULL,
             role VARCHAR(20) CHECK (role IN ('admin', 'user')) NOT NULL DEFAULT 'user',
             security_score FLOAT CHECK (security_score >= 0 AND security_score <= 10) DEFAULT 10.0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            -- Embedded in access tokens as 'ver'; bumping it revokes them
+            token_version INTEGER NOT NULL DEFAULT 0
         );
         """,
 
@@ -89,7 +116,13 @@ def setup_database():
             category VARCHAR(50),
             status VARCHAR(20) CHECK (status IN ('available', 'maintenance', 'rented')) DEFAULT 'available',
             image_url VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            -- Full-text document kept in sync by Postgres (name > category > description)
+            search_vector TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            ) STORED
         );
         """,
 
@@ -103,7 +136,14 @@ def setup_database():
             end_date DATE NOT NULL,
             total_price DECIMAL(10, 2),
             status VARCHAR(20) CHECK (status IN ('pending', 'approved', 'rejected', 'completed', 'cancelled')) DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            -- Inclusive booking period, used by the overlap constraint below
+            period DATERANGE GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED,
+            CHECK (end_date >= start_date),
+            -- Availability rule: active bookings of the same tool may not overlap.
+            -- Enforced by a GiST index, so it is race-free under concurrent inserts.
+            CONSTRAINT reservations_no_overlap EXCLUDE USING GIST (tool_id WITH =, period WITH &&)
+                WHERE (status NOT IN ('cancelled', 'rejected'))
         );
         """,
 
@@ -118,8 +158,50 @@ def setup_database():
         );
         """,
 
-        # 7. Index (Req 7)
-        "CREATE INDEX idx_tool_search ON tools(name, category);",
+        # Rating aggregates, maintained incrementally by the review triggers
+        """
+        CREATE TABLE tool_rating_stats (
+            tool_id INTEGER PRIMARY KEY REFERENCES tools(id) ON DELETE CASCADE,
+            rating_sum BIGINT NOT NULL DEFAULT 0,
+            rating_count BIGINT NOT NULL DEFAULT 0,
+            rating_1 INTEGER NOT NULL DEFAULT 0,
+            rating_2 INTEGER NOT NULL DEFAULT 0,
+            rating_3 INTEGER NOT NULL DEFAULT 0,
+            rating_4 INTEGER NOT NULL DEFAULT 0,
+            rating_5 INTEGER NOT NULL DEFAULT 0
+        );
+        """,
+        """
+        CREATE TABLE owner_rating_stats (
+            owner_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            rating_sum BIGINT NOT NULL DEFAULT 0,
+            rating_count BIGINT NOT NULL DEFAULT 0,
+            rating_1 INTEGER NOT NULL DEFAULT 0,
+            rating_2 INTEGER NOT NULL DEFAULT 0,
+            rating_3 INTEGER NOT NULL DEFAULT 0,
+            rating_4 INTEGER NOT NULL DEFAULT 0,
+            rating_5 INTEGER NOT NULL DEFAULT 0
+        );
+        """,
+
+        # Admin dashboard counters, maintained by statement-level triggers.
+        # Each counter is spread over slot rows and read as their sum.
+        """
+        CREATE TABLE stats_counters (
+            name VARCHAR(50) NOT NULL,
+            slot SMALLINT NOT NULL DEFAULT 0,
+            value NUMERIC NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (name, slot)
+        );
+        """,
+        "INSERT INTO stats_counters (name) VALUES ('users'), ('tools'), ('reservations'), ('completed_revenue');",
+
+        # 7. Indexes (Req 7)
+        # Search indexes: GIN over the tsvector for ranked full-text matches and
+        # a trigram GIN over name for typo-tolerant / substring matches.
+        "CREATE INDEX idx_tool_search ON tools USING GIN (search_vector);",
+        "CREATE INDEX idx_tool_name_trgm ON tools USING GIN (name gin_trgm_ops);",
 
         # 8. View (Req 6)
         """
@@ -141,72 +223,196 @@ def setup_database():
         $$ LANGUAGE plpgsql;
         """,
 
-        # Function 2: Update Score (Uses RECORD)
+        # Function 2: Update Score
+        # Rating counters are adjusted by +/- one review at a time (O(1), two
+        # primary key upserts) instead of re-aggregating every review.
+        """
+        CREATE OR REPLACE FUNCTION func_refresh_security_score(p_owner_id INTEGER)
+        RETURNS VOID AS $$
+        BEGIN
+            -- Normalize to 10 based (ratings are 1-5, so * 2); 10 when unrated
+            UPDATE users u
+            SET security_score = COALESCE(o.rating_sum::FLOAT / NULLIF(o.rating_count, 0), 5) * 2
+            FROM owner_rating_stats o
+            WHERE o.owner_id = p_owner_id AND u.id = p_owner_id;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION func_apply_rating(p_tool_id INTEGER, p_owner_id INTEGER, p_rating INTEGER, p_delta INTEGER)
+        RETURNS VOID AS $$
+        BEGIN
+            INSERT INTO tool_rating_stats AS s (tool_id, rating_sum, rating_count, rating_1, rating_2, rating_3, rating_4, rating_5)
+            VALUES (p_tool_id, p_rating * p_delta, p_delta,
+                    (p_rating = 1)::INT * p_delta, (p_rating = 2)::INT * p_delta, (p_rating = 3)::INT * p_delta,
+                    (p_rating = 4)::INT * p_delta, (p_rating = 5)::INT * p_delta)
+            ON CONFLICT (tool_id) DO UPDATE SET
+                rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+                rating_count = s.rating_count + EXCLUDED.rating_count,
+                rating_1 = s.rating_1 + EXCLUDED.rating_1,
+                rating_2 = s.rating_2 + EXCLUDED.rating_2,
+                rating_3 = s.rating_3 + EXCLUDED.rating_3,
+                rating_4 = s.rating_4 + EXCLUDED.rating_4,
+                rating_5 = s.rating_5 + EXCLUDED.rating_5;
+
+            INSERT INTO owner_rating_stats AS s (owner_id, rating_sum, rating_count, rating_1, rating_2, rating_3, rating_4, rating_5)
+            VALUES (p_owner_id, p_rating * p_delta, p_delta,
+                    (p_rating = 1)::INT * p_delta, (p_rating = 2)::INT * p_delta, (p_rating = 3)::INT * p_delta,
+                    (p_rating = 4)::INT * p_delta, (p_rating = 5)::INT * p_delta)
+            ON CONFLICT (owner_id) DO UPDATE SET
+                rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+                rating_count = s.rating_count + EXCLUDED.rating_count,
+                rating_1 = s.rating_1 + EXCLUDED.rating_1,
+                rating_2 = s.rating_2 + EXCLUDED.rating_2,
+                rating_3 = s.rating_3 + EXCLUDED.rating_3,
+                rating_4 = s.rating_4 + EXCLUDED.rating_4,
+                rating_5 = s.rating_5 + EXCLUDED.rating_5;
+
+            PERFORM func_refresh_security_score(p_owner_id);
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
         """
         CREATE OR REPLACE FUNCTION func_update_score()
         RETURNS TRIGGER AS $$
         DECLARE
             r RECORD;
-            avg_rating FLOAT;
+        BEGIN
+            -- Take back the old rating (UPDATE / DELETE)
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT res.tool_id, t.owner_id INTO r
+                FROM reservations res
+                JOIN tools t ON res.tool_id = t.id
+                WHERE res.id = OLD.reservation_id;
+                -- Parent already gone: its delete trigger has taken the rating back
+                IF FOUND AND OLD.rating IS NOT NULL THEN
+                    PERFORM func_apply_rating(r.tool_id, r.owner_id, OLD.rating, -1);
+                END IF;
+            END IF;
+
+            -- Count the new rating (INSERT / UPDATE)
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT res.tool_id, t.owner_id INTO r
+                FROM reservations res
+                JOIN tools t ON res.tool_id = t.id
+                WHERE res.id = NEW.reservation_id;
+                IF FOUND AND NEW.rating IS NOT NULL THEN
+                    PERFORM func_apply_rating(r.tool_id, r.owner_id, NEW.rating, 1);
+                END IF;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        # Reviews removed through ON DELETE CASCADE can no longer reach their tool,
+        # so the parents take their ratings back before they disappear.
+        """
+        CREATE OR REPLACE FUNCTION func_remove_reservation_ratings()
+        RETURNS TRIGGER AS $$
+        DECLARE
             owner_id_val INTEGER;
+            rv RECORD;
         BEGIN
-            -- Get owner_id from reservation -> tool
-            SELECT t.owner_id INTO owner_id_val
-            FROM reservations res
-            JOIN tools t ON res.tool_id = t.id
-            WHERE res.id = NEW.reservation_id;
-
-            -- Calculate new average
-            SELECT AVG(rating) INTO avg_rating
-            FROM reviews rv
-            JOIN reservations res ON rv.reservation_id = res.id
-            JOIN tools t ON res.tool_id = t.id
-            WHERE t.owner_id = owner_id_val;
-            
-            -- Normalize to 10 based (ratings are 1-5, so * 2)
-            IF avg_rating IS NULL THEN
-                avg_rating := 5; -- default
+            SELECT owner_id INTO owner_id_val FROM tools WHERE id = OLD.tool_id;
+            IF FOUND THEN
+                FOR rv IN SELECT rating FROM reviews WHERE reservation_id = OLD.id AND rating IS NOT NULL LOOP
+                    PERFORM func_apply_rating(OLD.tool_id, owner_id_val, rv.rating, -1);
+                END LOOP;
             END IF;
-            
-            UPDATE users SET security_score = (avg_rating * 2) WHERE id = owner_id_val;
-            
-            RETURN NEW;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION func_remove_tool_ratings()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE owner_rating_stats o SET
+                rating_sum = o.rating_sum - s.rating_sum,
+                rating_count = o.rating_count - s.rating_count,
+                rating_1 = o.rating_1 - s.rating_1,
+                rating_2 = o.rating_2 - s.rating_2,
+                rating_3 = o.rating_3 - s.rating_3,
+                rating_4 = o.rating_4 - s.rating_4,
+                rating_5 = o.rating_5 - s.rating_5
+            FROM tool_rating_stats s
+            WHERE s.tool_id = OLD.id AND o.owner_id = OLD.owner_id;
+            PERFORM func_refresh_security_score(OLD.owner_id);
+            RETURN OLD;
         END;
         $$ LANGUAGE plpgsql;
         """,
 
-        # Function 3: Search Tools (Uses CURSOR)
+        # Function 3: Dashboard counters
+        # Statement-level triggers with transition tables: one counter update
+        # per statement, however many rows it touched. The delta goes to the
+        # backend's own slot row (pid mod 64) rather than one row per counter,
+        # whose lock every concurrent writer would queue on until commit.
+        """
+        CREATE OR REPLACE FUNCTION func_add_to_counter(p_name TEXT, p_delta NUMERIC)
+        RETURNS VOID AS $$
+        BEGIN
+            INSERT INTO stats_counters (name, slot, value) VALUES (p_name, pg_backend_pid() % 64, p_delta)
+            ON CONFLICT (name, slot) DO UPDATE
+            SET value = stats_counters.value + EXCLUDED.value, updated_at = CURRENT_TIMESTAMP;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION func_track_row_count()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            delta BIGINT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT COUNT(*) INTO delta FROM new_rows;
+            ELSE
+                SELECT -COUNT(*) INTO delta FROM old_rows;
+            END IF;
+            IF delta <> 0 THEN
+                PERFORM func_add_to_counter(TG_TABLE_NAME, delta);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
         """
-        CREATE OR REPLACE FUNCTION func_search_tools(search_term VARCHAR)
-        RETURNS REFCURSOR AS $$
+        CREATE OR REPLACE FUNCTION func_track_revenue()
+        RETURNS TRIGGER AS $$
         DECLARE
-            ref REFCURSOR;
+            delta NUMERIC := 0;
         BEGIN
-            OPEN ref FOR 
-            SELECT * FROM tools 
-            WHERE name ILIKE '%' || search_term || '%' 
-               OR category ILIKE '%' || search_term || '%';
-            RETURN ref;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT delta + COALESCE(SUM(total_price), 0) INTO delta FROM new_rows WHERE status = 'completed';
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT delta - COALESCE(SUM(total_price), 0) INTO delta FROM old_rows WHERE status = 'completed';
+            END IF;
+            IF delta <> 0 THEN
+                PERFORM func_add_to_counter('completed_revenue', delta);
+            END IF;
+            RETURN NULL;
         END;
         $$ LANGUAGE plpgsql;
         """,
 
-        # Function 4: Trigger Function for Availability
+        # Function 4: Token revocation
+        # A role change bumps token_version; role/version changes and deletions
+        # are published so every API worker drops its cached auth entry.
         """
-        CREATE OR REPLACE FUNCTION func_check_availability()
+        CREATE OR REPLACE FUNCTION func_user_auth_changed()
         RETURNS TRIGGER AS $$
         BEGIN
-            IF EXISTS (
-                SELECT 1 FROM reservations
-                WHERE tool_id = NEW.tool_id
-                  AND status NOT IN ('cancelled', 'rejected')
-                  AND (
-                      (NEW.start_date BETWEEN start_date AND end_date) OR
-                      (NEW.end_date BETWEEN start_date AND end_date) OR
-                      (start_date BETWEEN NEW.start_date AND NEW.end_date)
-                  )
-            ) THEN
-                RAISE EXCEPTION 'Tool is not available for these dates';
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('toolshare_cache', 'user:' || OLD.id);
+                RETURN OLD;
+            END IF;
+            IF NEW.role IS DISTINCT FROM OLD.role THEN
+                NEW.token_version := OLD.token_version + 1;
+            END IF;
+            IF NEW.token_version IS DISTINCT FROM OLD.token_version THEN
+                PERFORM pg_notify('toolshare_cache', 'user:' || NEW.id);
             END IF;
             RETURN NEW;
         END;
@@ -229,16 +435,38 @@ def setup_database():
         # 10. Triggers (Req 12)
         """
         CREATE TRIGGER trg_update_score_after_review
-        AFTER INSERT ON reviews
+        AFTER INSERT OR UPDATE OF rating, reservation_id OR DELETE ON reviews
         FOR EACH ROW
         EXECUTE FUNCTION func_update_score();
         """,
         """
-        CREATE TRIGGER trg_check_availability
-        BEFORE INSERT ON reservations
+        CREATE TRIGGER trg_remove_reservation_ratings
+        BEFORE DELETE ON reservations
+        FOR EACH ROW
+        EXECUTE FUNCTION func_remove_reservation_ratings();
+        """,
+        """
+        CREATE TRIGGER trg_remove_tool_ratings
+        BEFORE DELETE ON tools
+        FOR EACH ROW
+        EXECUTE FUNCTION func_remove_tool_ratings();
+        """,
+        """
+        CREATE TRIGGER trg_user_auth_changed
+        BEFORE UPDATE OR DELETE ON users
         FOR EACH ROW
-        EXECUTE FUNCTION func_check_availability();
+        EXECUTE FUNCTION func_user_auth_changed();
         """,
+        # Transition tables allow one event per trigger, hence one trigger per event
+        "CREATE TRIGGER trg_count_users_insert AFTER INSERT ON users REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_count_users_delete AFTER DELETE ON users REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_count_tools_insert AFTER INSERT ON tools REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_count_tools_delete AFTER DELETE ON tools REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_count_reservations_insert AFTER INSERT ON reservations REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_count_reservations_delete AFTER DELETE ON reservations REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_row_count();",
+        "CREATE TRIGGER trg_revenue_insert AFTER INSERT ON reservations REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_revenue();",
+        "CREATE TRIGGER trg_revenue_update AFTER UPDATE ON reservations REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_revenue();",
+        "CREATE TRIGGER trg_revenue_delete AFTER DELETE ON reservations REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION func_track_revenue();",
 
 # ... (inside setup_database commands list) ...
         # 11. Seed Data
@@ -292,8 +520,272 @@ def setup_database():
     ]
     
     run_sql_commands(conn, commands)
+    # Fresh schema: bring it up to the latest migration
+    migrate(DATABASE_URL)
+    if scale:
+        generate_data(conn, scale, jobs or os.cpu_count() or 1)
     conn.close()
     print("Database setup complete.")
 
+# --- Synthetic data (--scale N) ---
+# Per scale unit: 1,000 users, 2,000 tools, ~10,000 reservations, ~3,000 reviews.
+USERS_PER_SCALE = 1000
+TOOLS_PER_SCALE = 2000
+# Each tool gets 0..RESERVATION_SLOTS bookings; ids are laid out in fixed slots
+# per tool so parallel workers never need to coordinate on ids.
+RESERVATION_SLOTS = 10
+USERS_PER_CHUNK = 50000
+TOOLS_PER_CHUNK = 10000
+GENERATED_PASSWORD = "pass123"
+
+FIRST_NAMES = ["James", "Mary", "Ahmet", "Ayse", "Mehmet", "Elif", "John", "Linda", "Can", "Zeynep",
+               "David", "Emma", "Murat", "Fatma", "Lucas", "Sofia", "Emre", "Selin", "Noah", "Olivia"]
+LAST_NAMES = ["Smith", "Yilmaz", "Kaya", "Johnson", "Demir", "Brown", "Sahin", "Garcia", "Celik", "Miller",
+              "Aydin", "Wilson", "Ozturk", "Taylor", "Arslan", "Moore", "Dogan", "Clark", "Koc", "Lewis"]
+TOOL_CATALOG = {
+    "Power Tools": ["Drill", "Circular Saw", "Jigsaw", "Angle Grinder", "Impact Driver", "Sander", "Router"],
+    "Hand Tools": ["Hammer", "Wrench Set", "Screwdriver Set", "Hand Saw", "Pliers", "Chisel Set"],
+    "Gardening": ["Lawn Mower", "Rake", "Hedge Trimmer", "Leaf Blower", "Chainsaw", "Tiller"],
+    "Construction": ["Ladder", "Scaffold", "Concrete Mixer", "Wheelbarrow", "Tile Cutter", "Laser Level"],
+    "Painting": ["Paint Sprayer", "Roller Kit", "Heat Gun", "Drop Cloth Set"],
+    "Photography": ["Tripod", "Camera Lens", "Softbox Kit", "Gimbal"],
+    "Cleaning": ["Pressure Washer", "Carpet Cleaner", "Wet Vacuum", "Floor Polisher"],
+}
+BRANDS = ["Makita", "Bosch", "DeWalt", "Ryobi", "Stanley", "Black+Decker", "Einhell", "Hitachi", "Karcher", "Fiskars"]
+CONDITIONS = ["like new", "well kept", "lightly used", "heavy duty", "professional grade", "compact"]
+REVIEW_COMMENTS = ["Worked perfectly.", "Great value.", "Owner was very helpful.", "A bit worn but did the job.",
+                   "Would rent again.", "Battery life was short.", "Exactly as described.", "Saved me a lot of time."]
+
+def _random_timestamp(rng, start: date, end: date) -> datetime:
+    seconds = max(1, (end - start).days * 86400)
+    return datetime.combine(start, datetime.min.time()) + timedelta(seconds=rng.randrange(seconds))
+
+def _load_users(first_id, count, chunk, password_hash, seed):
+    """Worker: COPYs `count` users with ids starting at first_id."""
+    rng = random.Random(seed * 1000003 + chunk)
+    today = date.today()
+    with psycopg.connect(DATABASE_URL) as conn:
+        cur = conn.cursor()
+        with cur.copy("COPY users (id, name, email, password, role, created_at) FROM STDIN") as copy:
+            for user_id in range(first_id, first_id + count):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                copy.write_row((
+                    user_id, f"{first} {last}", f"{first}.{last}.{user_id}@example.com".lower(),
+                    password_hash, 'user', _random_timestamp(rng, today - timedelta(days=1095), today),
+                ))
+    return count
+
+def _load_tools(first_tool, count, first_reservation, first_review, user_ids, chunk, seed):
+    """
+    Worker: COPYs `count` tools plus their reservations and reviews. A tool's
+    bookings are generated here in date order with gaps between them, so they
+    never overlap and satisfy reservations_no_overlap by construction.
+    """
+    rng = random.Random(seed * 1000003 + 500009 + chunk)
+    today = date.today()
+    first_user, last_user = user_ids
+    categories = list(TOOL_CATALOG)
+    tools, reservations, reviews = [], [], []
+    for index in range(count):
+        tool_id = first_tool + index
+        owner_id = rng.randint(first_user, last_user)
+        category = rng.choice(categories)
+        item = rng.choice(TOOL_CATALOG[category])
+        price = round(rng.uniform(3, 80), 2)
+        created_at = _random_timestamp(rng, today - timedelta(days=1000), today - timedelta(days=760))
+        status = rng.choices(['available', 'maintenance', 'rented'], weights=[90, 4, 6])[0]
+        tools.append((
+            tool_id, owner_id, f"{rng.choice(BRANDS)} {item}", f"{item}, {rng.choice(CONDITIONS)}",
+            price, category, status, created_at,
+        ))
+
+        day = today - timedelta(days=rng.randint(60, 500))
+        slot_base = (tool_id - first_tool) * RESERVATION_SLOTS
+        for slot in range(rng.randint(0, RESERVATION_SLOTS)):
+            start = day + timedelta(days=rng.randint(1, 45))
+            end = start + timedelta(days=rng.randint(0, 6))
+            day = end
+            renter_id = rng.randint(first_user, last_user)
+            if renter_id == owner_id:
+                renter_id = first_user if owner_id == last_user else owner_id + 1
+            if end < today:
+                res_status = rng.choices(['completed', 'cancelled', 'rejected'], weights=[85, 10, 5])[0]
+            elif start > today:
+                res_status = rng.choice(['pending', 'approved'])
+            else:
+                res_status = 'approved'
+            reservation_id = first_reservation + slot_base + slot
+            reservations.append((
+                reservation_id, tool_id, renter_id, start, end,
+                round(price * ((end - start).days + 1), 2), res_status,
+                datetime.combine(start, datetime.min.time()) - timedelta(days=rng.randint(1, 14)),
+            ))
+            if res_status == 'completed' and rng.random() < 0.35:
+                reviews.append((
+                    first_review + slot_base + slot, reservation_id, rng.choices([1, 2, 3, 4, 5], weights=[3, 5, 12, 35, 45])[0],
+                    rng.choice(REVIEW_COMMENTS), _random_timestamp(rng, end + timedelta(days=1), end + timedelta(days=15)),
+                ))
+
+    with psycopg.connect(DATABASE_URL) as conn:
+        cur = conn.cursor()
+        with cur.copy("COPY tools (id, owner_id, name, description, daily_price, category, status, created_at) FROM STDIN") as copy:
+            for row in tools:
+                copy.write_row(row)
+        with cur.copy("COPY reservations (id, tool_id, renter_id, start_date, end_date, total_price, status, created_at) FROM STDIN") as copy:
+            for row in reservations:
+                copy.write_row(row)
+        with cur.copy("COPY reviews (id, reservation_id, rating, comment, created_at) FROM STDIN") as copy:
+            for row in reviews:
+                copy.write_row(row)
+    return len(tools), len(reservations), len(reviews)
+
+# Aggregates and timelines normally kept by triggers, rebuilt in one pass after the load
+REBUILD_DERIVED_SQL = [
+    "TRUNCATE tool_rating_stats, owner_rating_stats, user_activity;",
+    """
+    INSERT INTO user_activity (user_id, tool_id, kind, occurred_at)
+    SELECT owner_id, id, 'Owned', created_at::date FROM tools WHERE owner_id IS NOT NULL;
+    """,
+    """
+    INSERT INTO user_activity (user_id, tool_id, reservation_id, kind, occurred_at)
+    SELECT renter_id, tool_id, id, 'Rented', start_date FROM reservations
+    WHERE renter_id IS NOT NULL AND tool_id IS NOT NULL;
+    """,
+    """
+    INSERT INTO tool_rating_stats (tool_id, rating_sum, rating_count, rating_1, rating_2, rating_3, rating_4, rating_5)
+    SELECT res.tool_id, SUM(r.rating), COUNT(r.rating),
+           COUNT(*) FILTER (WHERE r.rating = 1), COUNT(*) FILTER (WHERE r.rating = 2), COUNT(*) FILTER (WHERE r.rating = 3),
+           COUNT(*) FILTER (WHERE r.rating = 4), COUNT(*) FILTER (WHERE r.rating = 5)
+    FROM reviews r
+    JOIN reservations res ON r.reservation_id = res.id
+    WHERE r.rating IS NOT NULL
+    GROUP BY res.tool_id;
+    """,
+    """
+    INSERT INTO owner_rating_stats (owner_id, rating_sum, rating_count, rating_1, rating_2, rating_3, rating_4, rating_5)
+    SELECT t.owner_id, SUM(s.rating_sum), SUM(s.rating_count),
+           SUM(s.rating_1), SUM(s.rating_2), SUM(s.rating_3), SUM(s.rating_4), SUM(s.rating_5)
+    FROM tool_rating_stats s
+    JOIN tools t ON s.tool_id = t.id
+    GROUP BY t.owner_id;
+    """,
+    """
+    UPDATE users u
+    SET security_score = COALESCE(o.rating_sum::FLOAT / NULLIF(o.rating_count, 0), 5) * 2
+    FROM owner_rating_stats o
+    WHERE o.owner_id = u.id;
+    """,
+    "DELETE FROM stats_counters;",
+    """
+    INSERT INTO stats_counters (name, value) VALUES
+        ('users', (SELECT COUNT(*) FROM users)),
+        ('tools', (SELECT COUNT(*) FROM tools)),
+        ('reservations', (SELECT COUNT(*) FROM reservations)),
+        ('completed_revenue', (SELECT COALESCE(SUM(total_price), 0) FROM reservations WHERE status = 'completed'));
+    """,
+    "REFRESH MATERIALIZED VIEW owner_leaderboard;",
+    "UPDATE leaderboard_refresh SET refreshed_at = CURRENT_TIMESTAMP;",
+    "SELECT setval('users_id_seq', (SELECT MAX(id) FROM users));",
+    "SELECT setval('tools_id_seq', (SELECT MAX(id) FROM tools));",
+    "SELECT setval('reviews_id_seq', (SELECT MAX(id) FROM reviews));",
+    "SELECT setval('reservation_seq', (SELECT MAX(id) FROM reservations));",
+]
+
+GENERATED_TABLES = ("users", "tools", "reservations", "reviews")
+
+def _secondary_indexes(conn):
+    """
+    (drop, create) statements for every index and exclusion constraint on the
+    generated tables, except primary keys and unique constraints that foreign
+    keys and the loader rely on.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT format('ALTER TABLE %%I DROP CONSTRAINT %%I', c.conrelid::regclass, c.conname),
+               format('ALTER TABLE %%I ADD CONSTRAINT %%I %%s', c.conrelid::regclass, c.conname, pg_get_constraintdef(c.oid))
+        FROM pg_constraint c
+        WHERE c.contype = 'x' AND c.conrelid::regclass::text = ANY(%s)
+        UNION ALL
+        SELECT format('DROP INDEX %%I', i.indexrelid::regclass), pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid::regclass::text = ANY(%s)
+          AND NOT i.indisprimary
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+    """, (list(GENERATED_TABLES), list(GENERATED_TABLES)))
+    return cur.fetchall()
+
+def generate_data(conn, scale, jobs):
+    """
+    Bulk-loads realistic, referentially consistent data on top of the seed:
+    COPY from `jobs` parallel worker processes with user triggers disabled and
+    secondary indexes dropped, then indexes rebuilt and trigger-maintained
+    aggregates recomputed in one set-based pass.
+    """
+    started = time.perf_counter()
+    user_count = USERS_PER_SCALE * scale
+    tool_count = TOOLS_PER_SCALE * scale
+    # One pbkdf2 hash shared by every generated user (login with GENERATED_PASSWORD)
+    password_hash = get_hash(GENERATED_PASSWORD)
+    seed = scale
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT (SELECT COALESCE(MAX(id), 0) FROM users) AS users,
+               (SELECT COALESCE(MAX(id), 0) FROM tools) AS tools,
+               (SELECT COALESCE(MAX(id), 0) FROM reservations) AS reservations,
+               (SELECT COALESCE(MAX(id), 0) FROM reviews) AS reviews
+    """)
+    max_user, max_tool, max_reservation, max_review = cur.fetchone()
+
+    indexes = _secondary_indexes(conn)
+    for drop, _ in indexes:
+        cur.execute(drop)
+    for table in GENERATED_TABLES:
+        cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+    conn.commit()
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            first_user = max_user + 1
+            futures = [
+                executor.submit(_load_users, first_user + offset, min(USERS_PER_CHUNK, user_count - offset), chunk, password_hash, seed)
+                for chunk, offset in enumerate(range(0, user_count, USERS_PER_CHUNK))
+            ]
+            loaded = sum(f.result() for f in futures)
+            print(f"Loaded {loaded} users ({time.perf_counter() - started:.1f}s)")
+
+            user_ids = (first_user, max_user + user_count)
+            futures = [
+                executor.submit(
+                    _load_tools, max_tool + 1 + offset, min(TOOLS_PER_CHUNK, tool_count - offset),
+                    max_reservation + 1 + offset * RESERVATION_SLOTS, max_review + 1 + offset * RESERVATION_SLOTS,
+                    user_ids, chunk, seed,
+                )
+                for chunk, offset in enumerate(range(0, tool_count, TOOLS_PER_CHUNK))
+            ]
+            totals = [sum(column) for column in zip(*(f.result() for f in futures))]
+            print(f"Loaded {totals[0]} tools, {totals[1]} reservations, {totals[2]} reviews ({time.perf_counter() - started:.1f}s)")
+    finally:
+        for table in GENERATED_TABLES:
+            cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+        conn.commit()
+
+    for _, create in indexes:
+        cur.execute(create)
+        conn.commit()
+        print(f"Executed: {create[:50]}...")
+    for command in REBUILD_DERIVED_SQL:
+        cur.execute(command)
+    conn.commit()
+    conn.autocommit = True
+    cur.execute("ANALYZE")
+    conn.autocommit = False
+    print(f"Generated scale {scale} data in {time.perf_counter() - started:.1f}s")
+
 if __name__ == "__main__":
-    setup_database()
+    parser = argparse.ArgumentParser(description="Create the ToolShare schema and seed data.")
+    parser.add_argument("--scale", type=int, default=0,
+                        help=f"Also generate N x ({USERS_PER_SCALE} users, {TOOLS_PER_SCALE} tools, their reservations and reviews)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel loader processes (default: CPU count)")
+    args = parser.parse_args()
+    setup_database(scale=args.scale, jobs=args.jobs)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+import psycopg
+
+# Statements slower than this are captured with their plan
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+# Fraction of slow statements captured, and per-fingerprint minimum spacing
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_COOLDOWN_SECONDS = float(os.getenv("SLOW_QUERY_COOLDOWN_SECONDS", "60"))
+# EXPLAIN ANALYZE runs the statement again; cap how long it may take
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join("logs", "slow_queries.jsonl"))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))
+
+# Only plain reads are re-run with ANALYZE; anything that writes is explained without it
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|NEXTVAL|SETVAL|PG_NOTIFY)\b", re.IGNORECASE)
+
+_logger: Optional[logging.Logger] = None
+_last_capture = {}  # fingerprint -> monotonic time of the last capture
+_capturing = False
+_connection: Optional[psycopg.AsyncConnection] = None
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+        handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger = logging.getLogger("toolshare.slow_queries")
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        _logger.addHandler(handler)
+    return _logger
+
+def redact(params):
+    """
+    Keeps numbers, dates and booleans, which are needed to reproduce a plan,
+    and replaces strings and anything else with their type and length.
+    """
+    def one(value):
+        if value is None or isinstance(value, (bool, int, float, Decimal)):
+            return value if not isinstance(value, Decimal) else str(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, (str, bytes)):
+            return f"<{type(value).__name__}:{len(value)}>"
+        return f"<{type(value).__name__}>"
+
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: one(value) for key, value in params.items()}
+    return [one(value) for value in params]
+
+def maybe_capture(query, params, seconds: float, fingerprint, statement: str, route: Optional[str]):
+    """
+    Called for every statement slower than SLOW_QUERY_MS. Schedules a plan
+    capture in the background unless it is sampled out, the fingerprint was
+    captured recently, or another capture is still running.
+    """
+    global _capturing
+    if _capturing or not isinstance(query, str) or not _EXPLAINABLE.match(query):
+        return
+    if random.random() >= SLOW_QUERY_SAMPLE_RATE:
+        return
+    now = time.monotonic()
+    if now - _last_capture.get(fingerprint, -SLOW_QUERY_COOLDOWN_SECONDS) < SLOW_QUERY_COOLDOWN_SECONDS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _last_capture[fingerprint] = now
+    _capturing = True
+    loop.create_task(_capture(query, params, seconds, fingerprint, statement, route))
+
+async def _explain(query: str, params, analyze: bool):
+    """
+    Runs EXPLAIN on a dedicated connection, outside the pool so captures
+    never compete with requests, and always rolls back.
+    """
+    global _connection
+    from database import DATABASE_URL
+    if _connection is None or _connection.closed:
+        _connection = await psycopg.AsyncConnection.connect(DATABASE_URL)
+    conn = _connection
+    try:
+        cur = conn.cursor()
+        await cur.execute(f"SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}")
+        options = "ANALYZE, BUFFERS" if analyze else "VERBOSE"
+        await cur.execute(f"EXPLAIN ({options}) {query}", params)
+        return [row[0] for row in await cur.fetchall()]
+    finally:
+        await conn.rollback()
+
+async def _capture(query: str, params, seconds: float, fingerprint, statement: str, route: Optional[str]):
+    global _capturing
+    analyze = not _WRITES.search(query)
+    entry = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "route": route,
+        "fingerprint": fingerprint,
+        "statement": statement,
+        "params": redact(params),
+        "duration_ms": round(seconds * 1000, 2),
+        "analyzed": analyze,
+    }
+    try:
+        entry["plan"] = await _explain(query, params, analyze)
+    except Exception as e:
+        entry["plan"] = None
+        entry["error"] = str(e)
+    finally:
+        _capturing = False
+    try:
+        line = json.dumps(entry, default=str)
+        await asyncio.to_thread(_get_logger().info, line)
+    except Exception as e:
+        print(f"Slow query log error: {e}")
+
+def _read_recent(limit: int) -> list:
+    if not os.path.exists(SLOW_QUERY_LOG):
+        return []
+    with open(SLOW_QUERY_LOG) as f:
+        lines = deque(f, maxlen=limit)
+    entries = []
+    for line in reversed(lines):
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+async def recent_slow_queries(limit: int) -> list:
+    """Newest captures first, from the current log file."""
+    return await asyncio.to_thread(_read_recent, limit)
+
+async def close_capture_connection():
+    global _connection
+    if _connection is not None:
+        await _connection.close()
+        _connection = None
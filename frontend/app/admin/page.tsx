@@ -4,7 +4,9 @@ import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { Users, Toolbox, Trash2, Shield, Activity, BarChart3, Server, Clock, Search, AlertCircle } from 'lucide-react';
 import api from '@/lib/api';
+import usePagedList from '@/lib/usePagedList';
 import Navbar from '@/components/Navbar';
+import LoadMore from '@/components/LoadMore';
 
 export default function AdminDashboard() {
     const router = useRouter();
@@ -13,8 +15,8 @@ export default function AdminDashboard() {
 
     // Data States
     const [stats, setStats] = useState<any>(null);
-    const [users, setUsers] = useState<any[]>([]);
-    const [tools, setTools] = useState<any[]>([]);
+    const users = usePagedList('/admin/users');
+    const tools = usePagedList('/admin/tools');
     const [activity, setActivity] = useState<any[]>([]);
 
     // UI States
@@ -36,15 +38,13 @@ export default function AdminDashboard() {
 
             // Fetch Data
             try {
-                const [statsRes, usersRes, toolsRes, activityRes] = await Promise.all([
+                const [statsRes, activityRes] = await Promise.all([
                     api.get('/admin/stats'),
-                    api.get('/admin/users'),
-                    api.get('/admin/tools'),
-                    api.get('/admin/activity')
+                    api.get('/admin/activity'),
+                    users.load(),
+                    tools.load()
                 ]);
                 setStats(statsRes.data);
-                setUsers(usersRes.data);
-                setTools(toolsRes.data);
                 setActivity(activityRes.data);
             } catch (err) {
                 console.error(err);
@@ -60,7 +60,7 @@ export default function AdminDashboard() {
         if (!confirm('Are you sure you want to delete this user?')) return;
         try {
             await api.delete(`/admin/users/${id}`);
-            setUsers(users.filter(u => u.id !== id));
+            users.setItems(users.items.filter(u => u.id !== id));
         } catch (err: any) {
             alert(err.response?.data?.detail || 'Failed to delete');
         }
@@ -70,7 +70,7 @@ export default function AdminDashboard() {
         if (!confirm('Are you sure you want to delete this tool? THIS CANNOT BE UNDONE.')) return;
         try {
             await api.delete(`/tools/${id}`);
-            setTools(tools.filter(t => t.id !== id));
+            tools.setItems(tools.items.filter(t => t.id !== id));
             // Also update stats if we want precise count instantly, but stats are global
         } catch (err: any) {
             alert(err.response?.data?.detail || 'Failed to delete');
@@ -79,8 +79,9 @@ export default function AdminDashboard() {
 
     if (loading) return <div className="flex bg-gray-50 h-screen w-full items-center justify-center"><div className="animate-spin rounded-full h-8 w-8 border-b-2 border-black"></div></div>;
 
-    const filteredUsers = users.filter(u => u.name.toLowerCase().includes(searchQuery.toLowerCase()) || u.email.toLowerCase().includes(searchQuery.toLowerCase()));
-    const filteredTools = tools.filter(t => t.name.toLowerCase().includes(searchQuery.toLowerCase()) || t.owner_name.toLowerCase().includes(searchQuery.toLowerCase()));
+    // The search box filters the rows loaded so far
+    const filteredUsers = users.items.filter(u => u.name.toLowerCase().includes(searchQuery.toLowerCase()) || u.email.toLowerCase().includes(searchQuery.toLowerCase()));
+    const filteredTools = tools.items.filter(t => t.name.toLowerCase().includes(searchQuery.toLowerCase()) || t.owner_name.toLowerCase().includes(searchQuery.toLowerCase()));
 
     return (
         <div className="min-h-screen bg-gray-50/50 pb-12">
@@ -239,6 +240,7 @@ export default function AdminDashboard() {
                                     ))}
                                 </tbody>
                             </table>
+                            <LoadMore hasMore={users.hasMore} loading={users.loadingMore} onClick={users.loadMore} />
                         </div>
                     )}
 
@@ -279,6 +281,7 @@ export default function AdminDashboard() {
                                     ))}
                                 </tbody>
                             </table>
+                            <LoadMore hasMore={tools.hasMore} loading={tools.loadingMore} onClick={tools.loadMore} />
                         </div>
                     )}
 
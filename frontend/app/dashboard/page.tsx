@@ -4,14 +4,22 @@ import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { Plus, Edit, Trash, PenTool, Clock, Calendar, CheckCircle, XCircle } from 'lucide-react';
 import api from '@/lib/api';
+import usePagedList from '@/lib/usePagedList';
 import Link from 'next/link';
 import Navbar from '@/components/Navbar';
+import LoadMore from '@/components/LoadMore';
+
+const RENTALS = { role: 'renter' };
+const INCOMING = { role: 'owner' };
+const PENDING = { role: 'owner', status: 'pending' };
 
 export default function DashboardPage() {
     const router = useRouter();
     const [user, setUser] = useState<any>(null);
-    const [tools, setTools] = useState<any[]>([]);
-    const [reservations, setReservations] = useState<any[]>([]);
+    const tools = usePagedList('/tools/my');
+    const rentals = usePagedList('/reservations', RENTALS);
+    const incoming = usePagedList('/reservations', INCOMING);
+    const pending = usePagedList('/reservations', PENDING);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
@@ -30,12 +38,7 @@ export default function DashboardPage() {
 
     const fetchAllData = async (currentUser: any) => {
         try {
-            const [toolsRes, resRes] = await Promise.all([
-                api.get('/tools/my'),
-                api.get('/reservations')
-            ]);
-            setTools(toolsRes.data);
-            setReservations(resRes.data);
+            await Promise.all([tools.load(), rentals.load(), incoming.load(), pending.load()]);
         } catch (err) {
             console.error("Failed to fetch dashboard data", err);
         } finally {
@@ -47,7 +50,7 @@ export default function DashboardPage() {
         if (!confirm('Are you sure you want to delete this tool?')) return;
         try {
             await api.delete(`/tools/${id}`);
-            setTools(tools.filter(t => t.id !== id));
+            tools.setItems(tools.items.filter(t => t.id !== id));
         } catch (err) {
             alert('Failed to delete tool');
         }
@@ -57,9 +60,10 @@ export default function DashboardPage() {
         try {
             await api.put(`/reservations/${id}/status`, { status });
             // Update local state
-            setReservations(reservations.map(r =>
+            incoming.setItems(incoming.items.map(r =>
                 r.id === id ? { ...r, status } : r
             ));
+            pending.setItems(pending.items.filter(r => r.id !== id));
         } catch (err) {
             console.error(err);
             alert('Failed to update status');
@@ -69,9 +73,10 @@ export default function DashboardPage() {
     if (!user && loading) return <div className="flex justify-center items-center min-h-screen"><div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div></div>;
 
     // Filter Reservations
-    const myRentals = reservations.filter((r: any) => r.renter_id === user?.id);
-    const incomingRequests = reservations.filter((r: any) => r.tool_owner_id === user?.id && r.renter_id !== user?.id);
-    const pendingRequests = incomingRequests.filter((r: any) => r.status === 'pending');
+    // Bookings of one's own tools are listed under My Rentals only
+    const myRentals = rentals.items;
+    const incomingRequests = incoming.items.filter((r: any) => r.renter_id !== user?.id);
+    const pendingRequests = pending.items.filter((r: any) => r.renter_id !== user?.id);
 
     return (
         <div className="min-h-screen bg-gray-50/50">
@@ -126,6 +131,7 @@ export default function DashboardPage() {
                                     </div>
                                 ))}
                             </div>
+                            <LoadMore hasMore={pending.hasMore} loading={pending.loadingMore} onClick={pending.loadMore} />
                         </div>
                     </section>
                 )}
@@ -146,7 +152,7 @@ export default function DashboardPage() {
                     </div>
 
                     <div className="bg-white rounded-3xl shadow-sm border border-gray-100 overflow-hidden">
-                        {tools.length === 0 ? (
+                        {tools.items.length === 0 ? (
                             <div className="p-12 text-center">
                                 <div className="bg-gray-50 h-16 w-16 rounded-full flex items-center justify-center mx-auto mb-4">
                                     <PenTool className="h-8 w-8 text-gray-400" />
@@ -156,7 +162,7 @@ export default function DashboardPage() {
                             </div>
                         ) : (
                             <div className="divide-y divide-gray-100">
-                                {tools.map((tool) => (
+                                {tools.items.map((tool) => (
                                     <div key={tool.id} className="p-6 flex items-center justify-between hover:bg-gray-50 transition group">
                                         <div className="flex items-center gap-6">
                                             <div className="h-16 w-16 rounded-2xl bg-gray-100 overflow-hidden border border-gray-200">
@@ -194,6 +200,7 @@ export default function DashboardPage() {
                                 ))}
                             </div>
                         )}
+                        <LoadMore hasMore={tools.hasMore} loading={tools.loadingMore} onClick={tools.loadMore} />
                     </div>
                 </section>
 
@@ -226,6 +233,7 @@ export default function DashboardPage() {
                                     </tbody>
                                 </table>
                             )}
+                            <LoadMore hasMore={incoming.hasMore} loading={incoming.loadingMore} onClick={incoming.loadMore} />
                         </div>
                     </section>
 
@@ -254,6 +262,7 @@ export default function DashboardPage() {
                                     </tbody>
                                 </table>
                             )}
+                            <LoadMore hasMore={rentals.hasMore} loading={rentals.loadingMore} onClick={rentals.loadMore} />
                         </div>
                     </section>
                 </div>
@@ -2,12 +2,20 @@
 
 import { useEffect, useState } from 'react';
 import api from '@/lib/api';
+import usePagedList from '@/lib/usePagedList';
 import Link from 'next/link';
+import LoadMore from '@/components/LoadMore';
 import { LayoutGrid, TrendingUp, Activity } from 'lucide-react';
 
 export default function ReportsPage() {
     const [activeTab, setActiveTab] = useState('activity');
-    const [activityData, setActivityData] = useState<any[]>([]);
+    const [dateFrom, setDateFrom] = useState('');
+    const [dateTo, setDateTo] = useState('');
+    const activity = usePagedList('/reports/activity', {
+        include_total: true,
+        date_from: dateFrom || undefined,
+        date_to: dateTo || undefined
+    });
     const [statsData, setStatsData] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
 
@@ -15,12 +23,18 @@ export default function ReportsPage() {
         fetchData();
     }, [activeTab]);
 
+    // A new date range reloads the list in place, keeping the inputs mounted
+    useEffect(() => {
+        if (activeTab === 'activity' && !loading) {
+            activity.load().catch(console.error);
+        }
+    }, [dateFrom, dateTo]);
+
     const fetchData = async () => {
         setLoading(true);
         try {
             if (activeTab === 'activity') {
-                const res = await api.get('/reports/activity');
-                setActivityData(res.data);
+                await activity.load();
             } else {
                 const res = await api.get('/reports/stats');
                 setStatsData(res.data);
@@ -81,18 +95,47 @@ export default function ReportsPage() {
                         <div className="grid grid-cols-1 md:grid-cols-3 gap-6 mb-8">
                             <div className="bg-white p-6 rounded-2xl border border-gray-100 shadow-sm">
                                 <div className="text-gray-500 text-xs font-bold uppercase tracking-wider mb-2">Total Events</div>
-                                <div className="text-3xl font-black text-gray-900">{activityData.length}</div>
+                                {/* A planner estimate once there is more than one page */}
+                                <div className="text-3xl font-black text-gray-900">
+                                    {activity.hasMore ? `≈ ${activity.total ?? activity.items.length}` : activity.items.length}
+                                </div>
+                            </div>
+                            <div className="bg-white p-6 rounded-2xl border border-gray-100 shadow-sm md:col-span-2">
+                                <div className="text-gray-500 text-xs font-bold uppercase tracking-wider mb-2">Date Range</div>
+                                <div className="flex flex-wrap items-center gap-3">
+                                    <input
+                                        type="date"
+                                        value={dateFrom}
+                                        onChange={(e) => setDateFrom(e.target.value)}
+                                        className="border border-gray-200 rounded-lg px-3 py-2 text-sm"
+                                    />
+                                    <span className="text-gray-400">→</span>
+                                    <input
+                                        type="date"
+                                        value={dateTo}
+                                        onChange={(e) => setDateTo(e.target.value)}
+                                        className="border border-gray-200 rounded-lg px-3 py-2 text-sm"
+                                    />
+                                    {(dateFrom || dateTo) && (
+                                        <button
+                                            onClick={() => { setDateFrom(''); setDateTo(''); }}
+                                            className="text-sm font-medium text-gray-500 hover:text-blue-600"
+                                        >
+                                            Clear
+                                        </button>
+                                    )}
+                                </div>
                             </div>
                         </div>
 
                         {/* List */}
                         <div className="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden">
-                            {activityData.length === 0 ? (
+                            {activity.items.length === 0 ? (
                                 <div className="p-12 text-center text-gray-400">No activity recorded yet.</div>
                             ) : (
                                 <div className="divide-y divide-gray-100">
-                                    {activityData.map((item, idx) => (
-                                        <div key={idx} className="p-6 flex items-center justify-between hover:bg-gray-50 transition-colors">
+                                    {activity.items.map((item) => (
+                                        <div key={item.id} className="p-6 flex items-center justify-between hover:bg-gray-50 transition-colors">
                                             <div className="flex items-center gap-4">
                                                 <div className={`h-10 w-10 rounded-full flex items-center justify-center ${item.type === 'Owned' ? 'bg-blue-100 text-blue-600' : 'bg-purple-100 text-purple-600'
                                                     }`}>
@@ -110,6 +153,7 @@ export default function ReportsPage() {
                                     ))}
                                 </div>
                             )}
+                            <LoadMore hasMore={activity.hasMore} loading={activity.loadingMore} onClick={activity.loadMore} />
                         </div>
                     </div>
                 ) : (
@@ -1,12 +1,13 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import api from '@/lib/api';
+import usePagedList from '@/lib/usePagedList';
+import LoadMore from '@/components/LoadMore';
 import Link from 'next/link';
 import { ArrowLeft, Calendar } from 'lucide-react';
 
 export default function ReservationsPage() {
-    const [reservations, setReservations] = useState<any[]>([]);
+    const reservations = usePagedList('/reservations');
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
@@ -15,8 +16,7 @@ export default function ReservationsPage() {
 
     const fetchReservations = async () => {
         try {
-            const res = await api.get('/reservations');
-            setReservations(res.data);
+            await reservations.load();
         } catch (err) {
             console.error("Failed to fetch reservations", err);
         } finally {
@@ -41,13 +41,13 @@ export default function ReservationsPage() {
 
                 {loading ? (
                     <div className="text-center py-12 text-gray-500">Loading activity...</div>
-                ) : reservations.length === 0 ? (
+                ) : reservations.items.length === 0 ? (
                     <div className="text-center py-12 text-gray-500 bg-white rounded-lg shadow">
                         No reservations found. Go rent some tools!
                     </div>
                 ) : (
                     <div className="space-y-4">
-                        {reservations.map((res) => (
+                        {reservations.items.map((res) => (
                             <div key={res.id} className="bg-white rounded-lg shadow p-6 flex flex-col sm:flex-row justify-between items-start sm:items-center gap-4">
                                 <div className="flex items-start gap-4">
                                     {res.image_url && <img src={res.image_url} className="h-16 w-16 rounded object-cover" />}
@@ -75,6 +75,7 @@ export default function ReservationsPage() {
                                 </div>
                             </div>
                         ))}
+                        <LoadMore hasMore={reservations.hasMore} loading={reservations.loadingMore} onClick={reservations.loadMore} />
                     </div>
                 )}
             </div>
@@ -2,8 +2,10 @@
 
 import { useState, useEffect } from 'react';
 import { useRouter, useParams } from 'next/navigation';
-import api from '@/lib/api';
+import api, { getAll } from '@/lib/api';
+import usePagedList from '@/lib/usePagedList';
 import Link from 'next/link';
+import LoadMore from '@/components/LoadMore';
 import { ArrowLeft, Star, Calendar, Shield, User, Send } from 'lucide-react';
 
 export default function ToolDetailPage() {
@@ -12,7 +14,7 @@ export default function ToolDetailPage() {
     const toolId = params.id;
 
     const [tool, setTool] = useState<any>(null);
-    const [reviews, setReviews] = useState<any[]>([]);
+    const reviews = usePagedList(`/tools/${toolId}/reviews`);
     const [loading, setLoading] = useState(true);
     const [user, setUser] = useState<any>(null);
 
@@ -32,26 +34,20 @@ export default function ToolDetailPage() {
                     const parsedUser = JSON.parse(userData);
                     setUser(parsedUser);
 
-                    // Fetch user's reservations to see if they can review
-                    // Ideally backend should provide a generic "can_review" flag or list eligible reservations
-                    // For now, let's fetch all user reservations and filter client side or use a new endpoint.
-                    // Let's use the existing /reservations endpoint which returns MY reservations
-                    const myRes = await api.get('/reservations');
-                    // Filter for this tool and status='completed' or 'approved' and NOT reviewed? 
-                    // Backend check handles "already reviewed".
-                    // Let's filter for this toolId.
-                    const relevant = myRes.data.filter((r: any) => r.tool_id === parseInt(toolId as string) && (r.status === 'approved' || r.status === 'returned'));
+                    // Reservations the user made for this tool; the backend checks "already reviewed"
+                    // One user's bookings of one tool: small enough to load whole
+                    const myReservations = await getAll('/reservations', { params: { role: 'renter', tool_id: toolId } });
+                    const relevant = myReservations.filter((r: any) => r.status === 'approved' || r.status === 'returned');
                     setReservations(relevant);
                     if (relevant.length > 0) setSelectedReservationId(relevant[0].id);
                 }
 
-                const [toolRes, reviewsRes] = await Promise.all([
+                const [toolRes] = await Promise.all([
                     api.get(`/tools/${toolId}`),
-                    api.get(`/tools/${toolId}/reviews`)
+                    reviews.load()
                 ]);
 
                 setTool(toolRes.data);
-                setReviews(reviewsRes.data);
             } catch (err) {
                 console.error("Failed to fetch tool data", err);
             } finally {
@@ -77,8 +73,7 @@ export default function ToolDetailPage() {
             });
 
             // Refresh reviews
-            const reviewsRes = await api.get(`/tools/${toolId}/reviews`);
-            setReviews(reviewsRes.data);
+            await reviews.load();
             setComment('');
 
         } catch (err: any) {
@@ -173,10 +168,10 @@ export default function ToolDetailPage() {
                     <div className="lg:col-span-2 space-y-8">
                         <h2 className="text-2xl font-bold text-gray-900">Reviews</h2>
 
-                        {reviews.length === 0 ? (
+                        {reviews.items.length === 0 ? (
                             <p className="text-gray-500 italic">No reviews yet. Be the first to rent and review!</p>
                         ) : (
-                            reviews.map((review) => (
+                            reviews.items.map((review) => (
                                 <div key={review.id} className="bg-white p-6 rounded-2xl shadow-sm border border-gray-100">
                                     <div className="flex justify-between items-start mb-4">
                                         <div>
@@ -195,6 +190,7 @@ export default function ToolDetailPage() {
                                 </div>
                             ))
                         )}
+                        <LoadMore hasMore={reviews.hasMore} loading={reviews.loadingMore} onClick={reviews.loadMore} />
                     </div>
 
                     {/* Write Review Form */}
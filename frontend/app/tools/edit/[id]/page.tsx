@@ -40,17 +40,9 @@ export default function EditToolPage({ params }: { params: Promise<{ id: string
 
     const fetchTool = async (toolId: string) => {
         try {
-            // I don't have a direct "get single tool" endpoint in my plan, only list all or list my...
-            // Wait, I missed GET /api/tools/{id} in my main.py update.
-            // I only added GET /api/tools (list) and GET /api/tools/my
-            // I need to fetch the tool details.
-            // I can filter from "my tools" or add the endpoint.
-            // Adding endpoint is cleaner. For now I will fetch "my tools" and find it to save a backend roundtrip if I don't want to edit main.py again immediately.
-            // But editing main.py is better.
-
-            // Let's try fetching "all my tools" and finding it.
-            const res = await api.get('/tools/my');
-            const tool = res.data.find((t: any) => t.id === parseInt(toolId));
+            // Saving still checks ownership on the backend
+            const res = await api.get(`/tools/${toolId}`);
+            const tool = res.data;
             if (tool) {
                 setFormData({
                     name: tool.name,
@@ -63,8 +55,8 @@ export default function EditToolPage({ params }: { params: Promise<{ id: string
             } else {
                 setError('Tool not found');
             }
-        } catch (err) {
-            setError('Failed to load tool');
+        } catch (err: any) {
+            setError(err.response?.status === 404 ? 'Tool not found' : 'Failed to load tool');
         } finally {
             setLoading(false);
         }
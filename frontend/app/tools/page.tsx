@@ -5,12 +5,15 @@ import { Search, Filter, PenTool, Star, MapPin } from 'lucide-react';
 import api from '@/lib/api';
 import Link from 'next/link';
 import Navbar from '@/components/Navbar';
+import LoadMore from '@/components/LoadMore';
 
 export default function ToolsPage() {
     const [tools, setTools] = useState<any[]>([]);
     const [search, setSearch] = useState('');
     const [category, setCategory] = useState('');
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | undefined>();
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const categories = ['Power Tools', 'Gardening', 'Automotive', 'Cleaning', 'Hand Tools', 'Other'];
 
@@ -23,13 +26,16 @@ export default function ToolsPage() {
         try {
             // If search is active, use search endpoint (Requirement 11)
             if (search) {
-                const res = await api.get(`/tools/search?q=${search}`);
+                const res = await api.get('/tools/search', {
+                    params: { q: search, category: category || undefined }
+                });
                 setTools(res.data);
+                setNextCursor(undefined);
             } else {
                 // Use view endpoint (Requirement 6)
-                const url = category ? `/tools?category=${category}` : '/tools';
-                const res = await api.get(url);
+                const res = await api.get('/tools', { params: { category: category || undefined } });
                 setTools(res.data);
+                setNextCursor(res.headers['x-next-cursor']);
             }
         } catch (err) {
             console.error("Failed to fetch tools", err);
@@ -38,6 +44,19 @@ export default function ToolsPage() {
         }
     };
 
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const res = await api.get('/tools', { params: { category: category || undefined, cursor: nextCursor } });
+            setTools([...tools, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor']);
+        } catch (err) {
+            console.error("Failed to fetch tools", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleSearch = (e: React.FormEvent) => {
         e.preventDefault();
         fetchTools();
@@ -128,6 +147,8 @@ export default function ToolsPage() {
                         ))}
                     </div>
                 )}
+
+                {!loading && <LoadMore hasMore={!!nextCursor} loading={loadingMore} onClick={loadMore} />}
             </main>
         </div>
     );
@@ -0,0 +1,16 @@
+'use client';
+
+export default function LoadMore({ hasMore, loading, onClick }: { hasMore: boolean; loading: boolean; onClick: () => void }) {
+    if (!hasMore) return null;
+    return (
+        <div className="flex justify-center py-6">
+            <button
+                onClick={onClick}
+                disabled={loading}
+                className="px-6 py-3 bg-white border border-gray-200 rounded-xl font-bold text-gray-900 hover:border-gray-300 transition disabled:opacity-50"
+            >
+                {loading ? 'Loading...' : 'Load more'}
+            </button>
+        </div>
+    );
+}
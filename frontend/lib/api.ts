@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosRequestConfig } from 'axios';
 
 const api = axios.create({
     baseURL: 'http://localhost:8000/api',
@@ -21,4 +21,19 @@ api.interceptors.request.use(
     }
 );
 
+// List endpoints are keyset paginated: a page of rows, plus an X-Next-Cursor
+// header while more rows follow. Fetches every page and returns all rows, so
+// only use it for lists that stay small by construction; page anything else
+// with usePagedList.
+export const getAll = async (url: string, config: AxiosRequestConfig = {}) => {
+    const rows: any[] = [];
+    let cursor: string | undefined;
+    do {
+        const res = await api.get(url, { ...config, params: { limit: 500, ...config.params, cursor } });
+        rows.push(...res.data);
+        cursor = res.headers['x-next-cursor'];
+    } while (cursor);
+    return rows;
+};
+
 export default api;
@@ -0,0 +1,38 @@
+import { useState } from 'react';
+import api from '@/lib/api';
+
+// One keyset-paginated list: the rows loaded so far and the X-Next-Cursor
+// of the page after them. load() fetches the first page, loadMore() appends
+// the next one. With include_total in params, total holds the server's
+// estimate of the row count.
+export default function usePagedList(url: string, params: Record<string, any> = {}) {
+    const [items, setItems] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | undefined>();
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [total, setTotal] = useState<number | undefined>();
+
+    const fetchPage = async (cursor?: string) => {
+        const res = await api.get(url, { params: { ...params, cursor } });
+        setItems(prev => cursor ? [...prev, ...res.data] : res.data);
+        setNextCursor(res.headers['x-next-cursor']);
+        if (!cursor && res.headers['x-total-count-estimate'] !== undefined) {
+            setTotal(parseInt(res.headers['x-total-count-estimate']));
+        }
+    };
+
+    const load = () => fetchPage();
+
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            await fetchPage(nextCursor);
+        } catch (err) {
+            console.error(`Failed to fetch ${url}`, err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    return { items, setItems, hasMore: !!nextCursor, total, load, loadMore, loadingMore };
+}